@@ -0,0 +1,25 @@
+"""
+The URLs with ``ASYNC_VIEWS``: the async views of ``mow_api.async_views`` in
+front of the regular routes, which still reverse to the same paths.
+"""
+from django.urls import re_path
+from MeadowsOfWisdom_api import urls
+from mow_api import async_views
+
+urlpatterns = [
+    re_path(r"^api/funfacts$", async_views.FunFactListView.as_view()),
+    re_path(r"^api/funfacts/(?P<pk>[^/.]+)$", async_views.FunFactDetailView.as_view()),
+    re_path(
+        r"^api/funfacts/(?P<fact_id>\d+)/comments$",
+        async_views.CommentListView.as_view(),
+    ),
+    re_path(
+        r"api/(?P<comment_id>\d+)/comments/(?P<vote_value>[a-z]+)/votes/?$",
+        async_views.CommentVotesView.as_view(),
+    ),
+    re_path(
+        r"api/(?P<fact_id>\d+)/facts/(?P<vote_value>[a-z]+)/votes/?$",
+        async_views.FactVotesView.as_view(),
+    ),
+    *urls.urlpatterns,
+]
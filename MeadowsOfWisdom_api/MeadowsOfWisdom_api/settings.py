@@ -50,17 +50,31 @@ INSTALLED_APPS = [
     "mow_api",
 ]
 
+# Where Basic credentials are accepted besides /api/token, which exchanges them
+# for a JWT: "cached" on every endpoint, hashing each password once per
+# BASIC_AUTH_CACHE_TTL seconds, "always" hashing it on every request, "token"
+# nowhere else. See mow_api/authentication.py.
+BASIC_AUTH_POLICY = env.str("BASIC_AUTH_POLICY", "cached")
+BASIC_AUTH_CLASSES = {
+    "cached": ("mow_api.authentication.CachedBasicAuthentication",),
+    "always": ("rest_framework.authentication.BasicAuthentication",),
+    "token": (),
+}
+BASIC_AUTH_CACHE_TTL = env.float("BASIC_AUTH_CACHE_TTL", 30.0)
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.BasicAuthentication",
+        "mow_api.authentication.CachedJWTAuthentication",
+        *BASIC_AUTH_CLASSES[BASIC_AUTH_POLICY],
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    # Serializers emit camelCase keys themselves, see mow_api/camel.py.
     "DEFAULT_RENDERER_CLASSES": (
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
-        "djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer",
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
+    "EXCEPTION_HANDLER": "mow_api.camel.exception_handler",
     "DEFAULT_PARSER_CLASSES": (
         "djangorestframework_camel_case.parser.CamelCaseFormParser",
         "djangorestframework_camel_case.parser.CamelCaseMultiPartParser",
@@ -86,10 +100,14 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "djangorestframework_camel_case.middleware.CamelCaseMiddleWare",
 ]
 
-ROOT_URLCONF = "MeadowsOfWisdom_api.urls"
+# Serve the hot endpoints with the async views of mow_api/async_views.py. Only
+# worth it under ASGI, WSGI servers run them in a new event loop per request.
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", False)
+ROOT_URLCONF = (
+    "MeadowsOfWisdom_api.async_urls" if ASYNC_VIEWS else "MeadowsOfWisdom_api.urls"
+)
 
 TEMPLATES = [
     {
@@ -125,6 +143,60 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+if env.str("REDIS_URL", None):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("REDIS_URL"),
+    }
+
+FUNFACT_CACHE_ALIAS = "default"
+FUNFACT_CACHE_TIMEOUT = env.int("FUNFACT_CACHE_TIMEOUT", 60)
+
+# Buffer votes in memory and write them in batches, see mow_api/write_behind.py
+VOTE_WRITE_BEHIND = env.bool("VOTE_WRITE_BEHIND", False)
+VOTE_FLUSH_INTERVAL = env.float("VOTE_FLUSH_INTERVAL", 1.0)
+VOTE_FLUSH_SIZE = env.int("VOTE_FLUSH_SIZE", 1000)
+
+# Split the vote counters of objects voted on more than VOTE_SHARD_PROMOTION_RATE
+# times a minute across VOTE_COUNTER_SHARDS rows, see mow_api/sharding.py.
+# 0 disables the promotion.
+VOTE_SHARD_PROMOTION_RATE = env.int("VOTE_SHARD_PROMOTION_RATE", 0)
+VOTE_COUNTER_SHARDS = env.int("VOTE_COUNTER_SHARDS", 8)
+
+# Keep users authenticated by JWT for JWT_USER_CACHE_TTL seconds in a per-process
+# cache of JWT_USER_CACHE_SIZE tokens, see mow_api/authentication.py. 0 disables it.
+JWT_USER_CACHE_TTL = env.float("JWT_USER_CACHE_TTL", 30.0)
+JWT_USER_CACHE_SIZE = env.int("JWT_USER_CACHE_SIZE", 10000)
+
+
+# Hasher of new passwords, "pbkdf2", "scrypt" or "argon2" (needs argon2-cffi), and
+# its cost: the PBKDF2 iterations, the scrypt work factor or the Argon2 time cost,
+# 0 for Django's default. Sign-ups hash on a pool of PASSWORD_HASH_WORKERS
+# threads. See mow_api/hashers.py and mow_api/registration.py.
+PASSWORD_HASHER = env.str("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASH_COST = env.int("PASSWORD_HASH_COST", 0)
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", 4)
+TUNED_PASSWORD_HASHERS = {
+    "pbkdf2": "mow_api.hashers.PBKDF2PasswordHasher",
+    "scrypt": "mow_api.hashers.ScryptPasswordHasher",
+    "argon2": "mow_api.hashers.Argon2PasswordHasher",
+}
+PASSWORD_HASHERS = [
+    TUNED_PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(path for name, path in TUNED_PASSWORD_HASHERS.items() if name != PASSWORD_HASHER),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
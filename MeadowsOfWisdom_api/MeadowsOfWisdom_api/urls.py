@@ -3,7 +3,7 @@ from django.urls import include, path, re_path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from mow_api import views
 from rest_framework import routers
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 
 router = routers.DefaultRouter(trailing_slash=False)
 router.register(r"funfacts", views.FunFactViewSet, basename="funfacts_test")
@@ -17,12 +17,18 @@ router.register(
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    # Before the router, which also routes "register" to the UserViewSet.
+    path("api/register", views.RegisterView.as_view(), name="register"),
     path("api/", include(router.urls)),
     path("api-auth/", include("rest_framework.urls", namespace="rest_framework")),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
+    path("api/cache/stats", views.CacheStatsView.as_view(), name="cache_stats"),
+    path("api/votes/batch", views.BatchVotesView.as_view(), name="batch_votes"),
+    path("api/search", views.SearchView.as_view(), name="search"),
+    path("api/export/<str:dataset>", views.ExportView.as_view(), name="export"),
     re_path(r"api/token/refresh/?", TokenRefreshView.as_view(), name="token_refresh"),
-    re_path(r"api/token/?", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    re_path(r"api/token/?", views.TokenObtainView.as_view(), name="token_obtain_pair"),
     re_path(
         r"api/(?P<comment_id>\d+)/comments/(?P<vote_value>[a-z]+)/votes/?$",
         view=views.CommentVotesView.as_view(),
@@ -0,0 +1,157 @@
+"""
+Compare the requests per second of the hot endpoints served by WSGI, by ASGI
+with the DRF views and by ASGI with the async views of ``ASYNC_VIEWS``.
+
+Run it from the project directory against a throwaway database that holds
+fun facts, e.g. one seeded by ``vote_index_plans.py --seed``:
+
+    python benchmarks/asgi_throughput.py --concurrency 64
+
+The requests go through the whole Django stack in process, without a server
+or sockets. WSGI gets one thread and one database connection per concurrent
+client. ASGI runs every client in one event loop: the DRF views each take a
+trip to the single thread ``sync_to_async`` runs them in, the async views only
+for their database queries.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+USERNAME = "bench_async"
+URLCONFS = {
+    "WSGI": "MeadowsOfWisdom_api.urls",
+    "ASGI, sync views": "MeadowsOfWisdom_api.urls",
+    "ASGI, async views": "MeadowsOfWisdom_api.async_urls",
+}
+
+
+def setup_django():
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "MeadowsOfWisdom_api.settings")
+    import django
+
+    django.setup()
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+
+
+def get_headers():
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    user, _ = User.objects.get_or_create(username=USERNAME)
+    return {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+
+def targets():
+    """
+    Request builders by name, each returning a ``(method, path)`` pair.
+    """
+    from django.urls import reverse
+    from mow_api.models import FunFact
+
+    ids = list(FunFact.objects.values_list("id", flat=True)[:100])
+    votes = ["upvote", "downvote", "none"]
+    return {
+        "fact list": lambda: ("get", reverse("funfacts_test-list")),
+        "fact detail": lambda: (
+            "get",
+            reverse("funfacts_test-detail", args=[random.choice(ids)]),
+        ),
+        "put vote": lambda: (
+            "put",
+            reverse("fact_votes", args=[random.choice(ids), random.choice(votes)]),
+        ),
+    }
+
+
+def check(response, method, path):
+    assert response.status_code == 200, (method, path, response.status_code)
+
+
+def use_urlconf(urlconf):
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    settings.ROOT_URLCONF = urlconf
+    clear_url_caches()
+
+
+def run_wsgi(target, headers, concurrency, seconds):
+    from django.db import connections
+    from django.test import Client
+
+    deadline = time.perf_counter() + seconds
+    lock, counts = threading.Lock(), []
+
+    def client():
+        session, requests = Client(), 0
+        while time.perf_counter() < deadline:
+            method, path = target()
+            response = getattr(session, method)(path, headers=headers)
+            check(response, method, path)
+            requests += 1
+        connections.close_all()
+        with lock:
+            counts.append(requests)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+async def run_asgi(target, headers, concurrency, seconds):
+    from django.test import AsyncClient
+
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        session, requests = AsyncClient(), 0
+        while time.perf_counter() < deadline:
+            method, path = target()
+            response = await getattr(session, method)(path, headers=headers)
+            check(response, method, path)
+            requests += 1
+        return requests
+
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(client() for _ in range(concurrency)))
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--seconds", type=float, default=5, help="duration of each measurement"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=64, help="number of concurrent clients"
+    )
+    args = parser.parse_args()
+
+    setup_django()
+    headers = get_headers()
+    for name, target in targets().items():
+        print(f"--- {name}, {args.concurrency} concurrent clients")
+        for mode, urlconf in URLCONFS.items():
+            use_urlconf(urlconf)
+            if mode == "WSGI":
+                rate = run_wsgi(target, headers, args.concurrency, args.seconds)
+            else:
+                rate = asyncio.run(
+                    run_asgi(target, headers, args.concurrency, args.seconds)
+                )
+            print(f"{mode:>18}: {rate:8.1f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Compare the requests per second of one authenticated endpoint with JWT,
+Basic and cached Basic credentials.
+
+Run it from the project directory against a throwaway database that holds at
+least one fun fact, e.g. one seeded by ``vote_index_plans.py --seed``:
+
+    python benchmarks/auth_throughput.py
+
+The requests go through the whole Django and DRF stack in process, without a
+server, so the differences are the authentication costs: a user query for
+plain JWT, a full password hash per request for Basic, and neither once
+cached.
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+from pathlib import Path
+
+USERNAME = "bench_auth"
+PASSWORD = "bench password"
+
+
+def setup_django():
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "MeadowsOfWisdom_api.settings")
+    import django
+
+    django.setup()
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+
+
+def get_user():
+    from django.contrib.auth.models import User
+
+    user, created = User.objects.get_or_create(username=USERNAME)
+    if created or not user.check_password(PASSWORD):
+        user.set_password(PASSWORD)
+        user.save()
+    return user
+
+
+def schemes(user):
+    from mow_api.authentication import (
+        CachedBasicAuthentication,
+        CachedJWTAuthentication,
+    )
+    from rest_framework.authentication import BasicAuthentication
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    bearer = f"Bearer {RefreshToken.for_user(user).access_token}"
+    basic = "Basic " + base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
+    return {
+        "JWT": (JWTAuthentication, bearer),
+        "cached JWT": (CachedJWTAuthentication, bearer),
+        "Basic": (BasicAuthentication, basic),
+        "cached Basic": (CachedBasicAuthentication, basic),
+    }
+
+
+def throughput(url, authentication, header, seconds):
+    from mow_api.views import FunFactViewSet
+    from rest_framework.test import APIClient
+
+    FunFactViewSet.authentication_classes = [authentication]
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=header)
+    assert client.get(url).status_code == 200
+
+    requests, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        client.get(url)
+        requests += 1
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--seconds", type=float, default=5, help="duration of each measurement"
+    )
+    args = parser.parse_args()
+
+    setup_django()
+    from django.urls import reverse
+    from mow_api.models import FunFact
+
+    url = reverse("funfacts_test-detail", args=[FunFact.objects.first().id])
+    for name, (authentication, header) in schemes(get_user()).items():
+        rate = throughput(url, authentication, header, args.seconds)
+        print(f"{name:>12}: {rate:8.1f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare the serializer and the values() reader paths of the fun fact listing.
+
+Run it from the project directory against a throwaway database that holds at
+least 1,000 fun facts, e.g. one seeded by ``vote_index_plans.py --seed``:
+
+    python benchmarks/list_serializers.py
+
+Each page is built from the queryset to the rendered bytes, for an anonymous
+and a signed in reader, and both paths are checked to render the same bytes.
+"""
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+PAGE_SIZES = [100, 1000]
+
+
+def setup_django():
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "MeadowsOfWisdom_api.settings")
+    import django
+
+    django.setup()
+
+
+def make_request(user):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    request = Request(APIRequestFactory().get("/api/funfacts"))
+    request.user = user
+    return request
+
+
+def serializer_page(request, size):
+    from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+    from mow_api.models import FunFact
+    from mow_api.serializers import FunFactSerializer
+
+    queryset = FunFact.objects.with_listing_data(request.user)
+    facts = list(queryset.order_by("-created_at", "-id")[:size])
+    data = FunFactSerializer(facts, many=True, context={"request": request}).data
+    return CamelCaseJSONRenderer().render(data)
+
+
+def reader_page(request, size):
+    from mow_api.models import FunFact
+    from mow_api.readers import FunFactReader, ValuesJSONRenderer
+
+    reader = FunFactReader({"request": request})
+    queryset = FunFact.objects.with_listing_data(request.user)
+    rows = reader.values(queryset).order_by("-created_at", "-id")[:size]
+    return ValuesJSONRenderer().render(reader.to_representation(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="pages per timing")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import AnonymousUser, User
+
+    readers = {
+        "anonymous": AnonymousUser(),
+        "signed in": User.objects.order_by("id").first(),
+    }
+    for name, user in readers.items():
+        request = make_request(user)
+        for size in PAGE_SIZES:
+            assert serializer_page(request, size) == reader_page(request, size)
+            timings = {
+                path.__name__: timeit.timeit(
+                    lambda: path(request, size), number=args.repeat
+                )
+                / args.repeat
+                for path in (serializer_page, reader_page)
+            }
+            slow, fast = timings["serializer_page"], timings["reader_page"]
+            print(
+                f"{name:>9} {size:>5} rows: serializer {slow * 1000:7.2f} ms, "
+                f"reader {fast * 1000:7.2f} ms, {slow / fast:4.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Show the query plans of the hot vote, comment and user queries with and without
+the composite indexes from migrations 0010, 0011, 0015 and 0017.
+
+Run it from the project directory against a throwaway database:
+
+    python benchmarks/vote_index_plans.py --seed
+
+``--seed`` fills the database with 1,000 users, 1,000 fun facts, 50,000
+comments and 1,000,000 votes using ``generate_series``. The "before" plans are
+taken inside a transaction that drops the indexes and is rolled back afterwards.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+USERS = 1000
+FACTS = 1000
+COMMENTS = 50000
+
+INDEXES = [
+    "vote_target_idx",
+    "comment_thread_idx",
+    "comment_fact_created_idx",
+    "funfact_created_idx",
+    "funfact_hot_idx",
+    "user_joined_idx",
+]
+
+
+def setup_django():
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "MeadowsOfWisdom_api.settings")
+    import django
+
+    django.setup()
+
+
+def seed():
+    from django.contrib.contenttypes.models import ContentType
+    from django.core.management import call_command
+    from django.db import connection, transaction
+    from mow_api.models import FunFact
+
+    fact_type = ContentType.objects.get_for_model(FunFact)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO auth_user (password, is_superuser, username, first_name,
+                last_name, email, is_staff, is_active, date_joined)
+            SELECT '!', false, 'bench_' || n, '', '', '', false, true, now()
+            FROM generate_series(1, %s) AS n
+            """,
+            [USERS],
+        )
+        cursor.execute(
+            """
+            INSERT INTO mow_api_funfact (author_id, fact_text, created_at,
+                updated_at, upvote_count, downvote_count, score, hot_score,
+                sharded_counters, comment_count)
+            SELECT u.id, 'fact ' || n, now() - n * interval '1 minute', now(),
+                0, 0, 0, 0, false, 0
+            FROM generate_series(1, %s) AS n
+            JOIN auth_user u ON u.username = 'bench_' || (1 + n %% %s)
+            """,
+            [FACTS, USERS],
+        )
+        cursor.execute(
+            """
+            INSERT INTO mow_api_funfactcomment (author_id, fact_id, comment_text,
+                created_at, updated_at, upvote_count, downvote_count, score,
+                hot_score, sharded_counters, reply_count, path, depth)
+            SELECT u.id, f.id, 'comment ' || n, now() - n * interval '1 second',
+                now(), 0, 0, 0, 0, false, 0, '', 0
+            FROM generate_series(1, %s) AS n
+            JOIN auth_user u ON u.username = 'bench_' || (1 + n %% %s)
+            JOIN mow_api_funfact f ON f.fact_text = 'fact ' || (1 + n %% %s)
+            """,
+            [COMMENTS, USERS, FACTS],
+        )
+        cursor.execute(
+            """
+            INSERT INTO mow_api_funfactvote (author_id, content_type_id, object_id,
+                vote)
+            SELECT u.id, %s, f.id,
+                CASE WHEN (u.id + f.id) %% 3 = 0 THEN 'downvote' ELSE 'upvote' END
+            FROM auth_user u CROSS JOIN mow_api_funfact f
+            WHERE u.username LIKE 'bench\\_%%'
+            """,
+            [fact_type.id],
+        )
+        cursor.execute("ANALYZE")
+    call_command("recount_votes")
+    call_command("recount_comments")
+
+
+def queries():
+    from django.contrib.auth.models import User
+    from django.contrib.contenttypes.models import ContentType
+    from mow_api.models import FunFact, FunFactComment, FunFactVote
+
+    fact = FunFact.objects.order_by("id").first()
+    fact_type = ContentType.objects.get_for_model(FunFact)
+    return {
+        "upvotes of one fact": FunFactVote.objects.filter(
+            content_type=fact_type, object_id=fact.id, vote="upvote"
+        ).values("id"),
+        "top-level comments of one fact": FunFactComment.objects.filter(
+            fact=fact, parent=None
+        ).order_by("created_at")[:20],
+        "newest fun facts page": FunFact.objects.order_by("-created_at", "-id")[:20],
+        "hot fun facts page": FunFact.objects.order_by("-hot_score", "-id")[:20],
+        "newest users page": User.objects.only(
+            "id", "username", "date_joined"
+        ).order_by("-date_joined", "-id")[:20],
+    }
+
+
+def explain_all(title):
+    print(f"===== {title} =====")
+    for name, queryset in queries().items():
+        print(f"--- {name}")
+        print(queryset.explain(analyze=True))
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", action="store_true", help="insert the dataset")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, transaction
+
+    if args.seed:
+        seed()
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for index in INDEXES:
+                cursor.execute(f"DROP INDEX {index}")
+        explain_all("before")
+        transaction.set_rollback(True)
+
+    explain_all("after")
+
+
+if __name__ == "__main__":
+    main()
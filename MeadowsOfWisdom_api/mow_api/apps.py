@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MowApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "mow_api"
+
+    def ready(self):
+        from mow_api import signals  # noqa: F401
@@ -0,0 +1,267 @@
+"""
+Native async paths for the busiest endpoints, routed by
+``MeadowsOfWisdom_api.async_urls`` when ``ASYNC_VIEWS`` is enabled under ASGI.
+
+DRF 3.14 views are synchronous, so under ASGI each request to them takes a
+trip through a worker thread. The views here answer the hot requests in the
+event loop instead, with the async ORM and cache API: signed-in fun fact and
+comment listings, fun fact details and ``PUT`` votes, authenticated with a
+Bearer token. They reuse the paginators, readers, serializers and
+validators of the DRF views and send the same bytes and headers.
+
+Every other request goes to the DRF view of the endpoint, ``sync_view``,
+unchanged: anonymous requests, which the response cache serves, other
+credentials, writes, errors, the browsable API and write-behind mode.
+Recording a vote is raw SQL, which Django 4.2 can only run synchronously, so
+that part still runs in a thread.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import SynchronousOnlyOperation, ValidationError
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from mow_api import caching, views, write_behind
+from mow_api.authentication import CachedJWTAuthentication
+from mow_api.conditional import list_validators, validator_fields
+from mow_api.models import FunFact, FunFactComment
+from mow_api.pagination import CommentPagination, FunFactPagination
+from mow_api.readers import CommentReader, FunFactReader, ValuesJSONRenderer
+from mow_api.serializers import FunFactSerializer
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+
+class Fallback(Exception):
+    """
+    Raised on a fast path for a request the DRF view has to answer.
+    """
+
+
+async def build_queryset(build, *args, **kwargs):
+    """
+    Call ``build``, which may look up content types. ``get_for_model`` only
+    queries until its cache is warm, those first calls run in a thread.
+    """
+    try:
+        return build(*args, **kwargs)
+    except SynchronousOnlyOperation:
+        return await sync_to_async(build)(*args, **kwargs)
+
+
+class AsyncFastPathView(views.CsrfExemptView):
+    """
+    Serve ``fast_<method>`` handlers in the event loop and everything they
+    raise ``Fallback`` for, and every other method, with ``sync_view``.
+    ``allow`` is the ``Allow`` header of the DRF view.
+    """
+
+    sync_view = None
+    allow = ""
+
+    async def fallback(self, request, *args, **kwargs):
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    get = post = put = patch = delete = options = fallback
+
+    async def serve(self, handler, request, *args, **kwargs):
+        try:
+            self.check(request)
+            return self.finalize(await handler(request, *args, **kwargs))
+        except Fallback:
+            return await self.fallback(request, *args, **kwargs)
+
+    def check(self, request):
+        """
+        Leave content negotiation and write-behind mode to the DRF view.
+        """
+        accept = request.headers.get("Accept", "*/*")
+        if accept not in ("*/*", JSONRenderer.media_type) or "format" in request.GET:
+            raise Fallback
+        if write_behind.get_buffer() is not None:
+            raise Fallback
+
+    async def authenticate(self, request):
+        """
+        Return the user of the request's Bearer token. Other credentials,
+        invalid tokens and anonymous requests go to the DRF view.
+        """
+        if "HTTP_AUTHORIZATION" not in request.META:
+            raise Fallback
+        try:
+            result = await CachedJWTAuthentication().aauthenticate(request)
+        except APIException:
+            raise Fallback
+        if result is None:
+            raise Fallback
+        return result[0]
+
+    def get_request(self, request, user):
+        request = Request(request)
+        request.user = user
+        return request
+
+    def respond(self, data, renderer_class=JSONRenderer, status=200):
+        return HttpResponse(
+            renderer_class().render(data),
+            status=status,
+            content_type=renderer_class.media_type,
+        )
+
+    def finalize(self, result):
+        """
+        The headers ``APIView.finalize_response`` adds.
+        """
+        patch_vary_headers(result, ["Accept"])
+        result["Allow"] = self.allow
+        return result
+
+
+class AsyncListView(AsyncFastPathView):
+    """
+    ``ConditionalListMixin`` and ``ReaderListMixin`` in the event loop.
+
+    Subclasses define ``get_queryset(user, **url_kwargs)`` for the listing,
+    ``get_validator_queryset(**url_kwargs)`` for its validators and
+    ``get_generation_key(object_id)`` for the cache generation of a row.
+    """
+
+    pagination_class = None
+    list_reader = None
+    allow = "GET, POST, HEAD, OPTIONS"
+
+    async def get(self, request, *args, **kwargs):
+        return await self.serve(self.fast_get, request, *args, **kwargs)
+
+    async def fast_get(self, request, *args, **kwargs):
+        user = await self.authenticate(request)
+        request = self.get_request(request, user)
+        paginator = self.pagination_class()
+        ordering = paginator.get_ordering(request)
+        queryset = self.get_validator_queryset(**kwargs)
+        queryset = queryset.only(*validator_fields(ordering))
+        try:
+            rows = await paginator.apaginate_queryset(queryset, request)
+        except APIException:
+            raise Fallback
+
+        keys = [self.get_generation_key(row.id) for row in rows]
+        current = await caching.agenerations(keys)
+        etag, last_modified = list_validators(request, paginator, rows, keys, current)
+        result = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if result is None:
+            reader = self.list_reader({"request": request})
+            queryset = await build_queryset(self.get_queryset, user, **kwargs)
+            page = await paginator.apaginate_queryset(
+                reader.values(queryset, ordering), request
+            )
+            data = paginator.get_paginated_response(reader.to_representation(page))
+            result = self.respond(data.data, ValuesJSONRenderer)
+        result["ETag"] = etag
+        if last_modified is not None:
+            result["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(result, ["Authorization"])
+        return result
+
+
+class FunFactListView(AsyncListView):
+    sync_view = staticmethod(
+        views.FunFactViewSet.as_view({"get": "list", "post": "create"})
+    )
+    pagination_class = FunFactPagination
+    list_reader = FunFactReader
+
+    def get_queryset(self, user):
+        return FunFact.objects.with_listing_data(user)
+
+    def get_validator_queryset(self):
+        return FunFact.objects.all()
+
+    def get_generation_key(self, fact_id):
+        return caching.fact_key(fact_id)
+
+
+class CommentListView(AsyncListView):
+    sync_view = staticmethod(
+        views.CommentsViewSet.as_view({"get": "list", "post": "create"})
+    )
+    pagination_class = CommentPagination
+    list_reader = CommentReader
+
+    def get_queryset(self, user, fact_id):
+        return FunFactComment.objects.filter(fact=fact_id).with_listing_data(user)
+
+    def get_validator_queryset(self, fact_id):
+        return FunFactComment.objects.filter(fact=fact_id)
+
+    def get_generation_key(self, comment_id):
+        return caching.comment_key(comment_id)
+
+
+class FunFactDetailView(AsyncFastPathView):
+    sync_view = staticmethod(
+        views.FunFactViewSet.as_view(
+            {
+                "get": "retrieve",
+                "put": "update",
+                "patch": "partial_update",
+                "delete": "destroy",
+            }
+        )
+    )
+    allow = "GET, PUT, PATCH, DELETE, HEAD, OPTIONS"
+
+    async def get(self, request, *args, **kwargs):
+        return await self.serve(self.fast_get, request, *args, **kwargs)
+
+    async def fast_get(self, request, pk):
+        user = await self.authenticate(request)
+        request = self.get_request(request, user)
+        queryset = await build_queryset(FunFact.objects.with_listing_data, user)
+        try:
+            fact = await queryset.aget(pk=pk)
+        except (FunFact.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Fallback
+        serializer = FunFactSerializer(fact, context={"request": request})
+        return self.respond(serializer.data)
+
+
+class AsyncVoteView(AsyncFastPathView):
+    """
+    ``PUT`` votes; ``views.put_vote`` runs in a thread, see the module docstring.
+    """
+
+    model = None
+    lookup = None
+    allow = "POST, PUT, PATCH, DELETE, OPTIONS"
+
+    async def put(self, request, *args, **kwargs):
+        return await self.serve(self.fast_put, request, *args, **kwargs)
+
+    async def fast_put(self, request, **kwargs):
+        user = await self.authenticate(request)
+        try:
+            result = await sync_to_async(self.put_vote)(user, kwargs)
+        except (APIException, Http404):
+            raise Fallback
+        return self.respond(result.data, status=result.status_code)
+
+    def put_vote(self, user, kwargs):
+        object_id = int(kwargs[self.lookup])
+        result = views.put_vote(user, self.model, object_id, kwargs)
+        write_behind.invalidate(self.model, object_id)
+        return result
+
+
+class FactVotesView(AsyncVoteView):
+    sync_view = staticmethod(views.FactVotesView.as_view())
+    model = FunFact
+    lookup = "fact_id"
+
+
+class CommentVotesView(AsyncVoteView):
+    sync_view = staticmethod(views.CommentVotesView.as_view())
+    model = FunFactComment
+    lookup = "comment_id"
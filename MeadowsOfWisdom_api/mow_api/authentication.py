@@ -0,0 +1,162 @@
+"""
+Authentication without a ``User`` query or a password hash on every request.
+
+``CachedJWTAuthentication`` keeps the users it loaded in a small per-process
+LRU cache keyed by user id and token ``jti``, for ``JWT_USER_CACHE_TTL``
+seconds. ``CachedBasicAuthentication`` does the same for verified Basic
+credentials, keyed by a salted HMAC of the username and password, for
+``BASIC_AUTH_CACHE_TTL`` seconds, so each password is only hashed once per
+TTL. Wrong credentials are never cached and always pay the full hash.
+
+Saving or deleting a user, which is how passwords are changed and accounts
+deactivated, drops their entries at once in this process; other processes
+notice within the TTL. Requests get a copy of the cached user, so nothing
+they set on it leaks into other requests.
+
+``CachedJWTAuthentication.aauthenticate`` is the same for the async views of
+``mow_api.async_views``, loading missed users with the async ORM.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BasicAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self.lock:
+            self.entries[key] = (user, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            stale = [
+                key
+                for key, (user, _) in self.entries.items()
+                if str(user.pk) == user_id
+            ]
+            for key in stale:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(settings.JWT_USER_CACHE_SIZE, settings.JWT_USER_CACHE_TTL)
+credentials_cache = UserCache(
+    settings.JWT_USER_CACHE_SIZE, settings.BASIC_AUTH_CACHE_TTL
+)
+
+
+def invalidate_user(user_id):
+    """
+    Drop the cached user now and again once the transaction commits, so no
+    request can cache the old row in between.
+    """
+    user_id = str(user_id)
+
+    def invalidate():
+        user_cache.invalidate(user_id)
+        credentials_cache.invalidate(user_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_cache_key(self, validated_token):
+        return (
+            str(validated_token.get(api_settings.USER_ID_CLAIM)),
+            validated_token.get(api_settings.JTI_CLAIM),
+        )
+
+    def get_user(self, validated_token):
+        if not user_cache.ttl:
+            return super().get_user(validated_token)
+        key = self.get_cache_key(validated_token)
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        return copy.copy(user)
+
+    async def aauthenticate(self, request):
+        """
+        ``authenticate`` for async views, on a Django ``HttpRequest``.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        key = self.get_cache_key(validated_token)
+        user = user_cache.get(key) if user_cache.ttl else None
+        if user is None:
+            try:
+                user_id = validated_token[api_settings.USER_ID_CLAIM]
+            except KeyError:
+                raise InvalidToken(
+                    _("Token contained no recognizable user identification")
+                )
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if not user.is_active:
+                raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+            if user_cache.ttl:
+                user_cache.set(key, user)
+        return copy.copy(user)
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    def authenticate_credentials(self, userid, password, request=None):
+        if not credentials_cache.ttl:
+            return super().authenticate_credentials(userid, password, request)
+        key = salted_hmac(
+            "mow_api.authentication.CachedBasicAuthentication",
+            f"{userid}\0{password}",
+            algorithm="sha256",
+        ).hexdigest()
+        user = credentials_cache.get(key)
+        if user is None:
+            user, _ = super().authenticate_credentials(userid, password, request)
+            credentials_cache.set(key, user)
+        return copy.copy(user), None
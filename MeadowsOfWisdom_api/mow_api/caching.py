@@ -0,0 +1,222 @@
+"""
+Response cache for anonymous fun fact listings.
+
+Cached entries are never deleted. They are invalidated by generation counters
+instead. A generation is the time of the last change in nanoseconds, which
+also makes it usable as a ``Last-Modified`` source.
+
+* every fact has its own generation, bumped when the fact, its votes or its
+  comments change, and a cached page remembers the generation of each fact on
+  it, so a vote only invalidates the pages that show the voted fact;
+* every comment has one too, bumped by its votes and replies;
+* the ``list`` generation is bumped when facts are added or removed, which
+  changes which facts land on which page;
+* the ``ranking`` generation is bumped by votes, which reorder score-based
+  listings but not the chronological one.
+
+Page entries read the fact generations after the page was built, so a vote
+landing in between can leave a stale page until ``FUNFACT_CACHE_TIMEOUT``.
+They also keep the ``ETag`` and ``Last-Modified`` of the page, so cache hits
+answer conditional requests without a query.
+"""
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import response
+
+LIST = "funfacts:list"
+RANKING = "funfacts:ranking"
+HITS = "funfacts:stats:hits"
+MISSES = "funfacts:stats:misses"
+
+
+def get_cache():
+    return caches[settings.FUNFACT_CACHE_ALIAS]
+
+
+def fact_key(fact_id):
+    return f"funfacts:fact:{fact_id}"
+
+
+def comment_key(comment_id):
+    return f"funfacts:comment:{comment_id}"
+
+
+def generations(keys):
+    """
+    Current value of every generation counter in ``keys``.
+
+    Counters missing from the cache, never bumped or evicted, start from the
+    current time, so they never come back with a value an old entry was stored
+    under.
+    """
+    cache = get_cache()
+    current = cache.get_many(keys)
+    for key in keys:
+        if key not in current:
+            cache.add(key, time.time_ns(), timeout=None)
+            current[key] = cache.get(key)
+    return current
+
+
+async def agenerations(keys):
+    """
+    ``generations`` for async views.
+    """
+    cache = get_cache()
+    current = await cache.aget_many(keys)
+    for key in keys:
+        if key not in current:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            current[key] = await cache.aget(key)
+    return current
+
+
+def bump(*keys):
+    now = time.time_ns()
+    get_cache().set_many({key: now for key in keys}, timeout=None)
+
+
+def bump_on_commit(*keys):
+    """
+    Bump ``keys`` once the current transaction commits, so no reader can cache
+    the old data under the new generation in between.
+    """
+    transaction.on_commit(lambda: bump(*keys))
+
+
+def invalidate_fact(fact_id, listing=False, ranking=False):
+    keys = [fact_key(fact_id)]
+    if listing:
+        keys.append(LIST)
+    if ranking:
+        keys.append(RANKING)
+    bump_on_commit(*keys)
+
+
+def invalidate_comment(comment_id):
+    bump_on_commit(comment_key(comment_id))
+
+
+def record(hit):
+    cache = get_cache()
+    key = HITS if hit else MISSES
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def stats():
+    counts = get_cache().get_many([HITS, MISSES])
+    hits, misses = counts.get(HITS, 0), counts.get(MISSES, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else None,
+    }
+
+
+def request_digest(request):
+    url = request.build_absolute_uri()
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def get_page(request, list_keys):
+    """
+    Return the cached entry for this listing URL, its ``data`` and
+    ``validators``, or ``None``.
+
+    ``list_keys`` are the listing-wide generations the page depends on. The
+    returned ``key`` is what ``set_page`` needs to store a freshly built page.
+    """
+    cache = get_cache()
+    list_generations = generations(list_keys)
+    suffix = ":".join(str(list_generations[key]) for key in list_keys)
+    key = f"funfacts:page:{suffix}:{request_digest(request)}"
+    entry = cache.get(key)
+    if entry is not None:
+        current = generations(list(entry["facts"]))
+        if current == entry["facts"] and "validators" in entry:
+            return key, entry
+    return key, None
+
+
+def set_page(key, data, fact_generations, validators):
+    get_cache().set(
+        key,
+        {"data": data, "facts": fact_generations, "validators": validators},
+        timeout=settings.FUNFACT_CACHE_TIMEOUT,
+    )
+
+
+def get_detail(fact_id):
+    key = fact_key(fact_id)
+    generation = generations([key])[key]
+    entry = get_cache().get(f"funfacts:detail:{fact_id}")
+    if entry is not None and entry["generation"] == generation:
+        return generation, entry["data"]
+    return generation, None
+
+
+def set_detail(fact_id, data, generation):
+    get_cache().set(
+        f"funfacts:detail:{fact_id}",
+        {"data": data, "generation": generation},
+        timeout=settings.FUNFACT_CACHE_TIMEOUT,
+    )
+
+
+class AnonymousCacheMixin:
+    """
+    Serve anonymous ``list`` and ``retrieve`` of fun facts from the response
+    cache. Authenticated responses carry the user's reactions and are always
+    built fresh.
+
+    Goes before ``ConditionalListMixin``: pages are stored with its validators
+    and answered with its ``conditional_response``, so a hit runs no query.
+    """
+
+    def get_list_generation_keys(self):
+        keys = [LIST]
+        ordering = self.paginator.get_ordering(self.request)
+        if ordering[0].lstrip("-") != "created_at":
+            keys.append(RANKING)
+        return keys
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        key, entry = get_page(request, self.get_list_generation_keys())
+        record(hit=entry is not None)
+        if entry is not None:
+            build = partial(response.Response, entry["data"])
+            result = self.conditional_response(request, *entry["validators"], build)
+            result["X-Cache"] = "HIT"
+            return result
+
+        result = super().list(request, *args, **kwargs)
+        if result.status_code == 200:
+            fact_keys = [fact_key(fact["id"]) for fact in result.data["results"]]
+            set_page(key, result.data, generations(fact_keys), self.list_validators)
+        result["X-Cache"] = "MISS"
+        return result
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().retrieve(request, *args, **kwargs)
+        generation, data = get_detail(kwargs["pk"])
+        record(hit=data is not None)
+        if data is not None:
+            return response.Response(data, headers={"X-Cache": "HIT"})
+
+        result = super().retrieve(request, *args, **kwargs)
+        set_detail(kwargs["pk"], result.data, generation)
+        result["X-Cache"] = "MISS"
+        return result
@@ -0,0 +1,55 @@
+"""
+camelCase API output without the runtime key rewrite of
+``djangorestframework_camel_case``.
+
+Serializers with ``CamelCaseOutputMixin`` emit camelCase keys looked up in a
+table built when the class is created, and the API renders with the plain
+``JSONRenderer``. Keys are converted with the library's own rule, so the
+output is the same as with ``CamelCaseJSONRenderer``. Error responses are
+rare and still camelized when they are raised.
+"""
+import functools
+import re
+
+from djangorestframework_camel_case.settings import api_settings
+from djangorestframework_camel_case.util import (
+    camelize,
+    camelize_re,
+    underscore_to_camel,
+)
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+@functools.lru_cache(maxsize=None)
+def camel_key(name):
+    if "_" not in name:
+        return name
+    return re.sub(camelize_re, underscore_to_camel, name)
+
+
+def camelize_keys(data):
+    return {camel_key(key): value for key, value in data.items()}
+
+
+class CamelCaseOutputMixin:
+    output_keys = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = getattr(getattr(cls, "Meta", None), "fields", ())
+        if isinstance(fields, str):
+            fields = ()
+        names = [*fields, *cls._declared_fields]
+        cls.output_keys = {name: camel_key(name) for name in names}
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        keys = self.output_keys
+        return {keys.get(key) or camel_key(key): value for key, value in data.items()}
+
+
+def exception_handler(exc, context):
+    response = drf_exception_handler(exc, context)
+    if response is not None:
+        response.data = camelize(response.data, **api_settings.JSON_UNDERSCOREIZE)
+    return response
@@ -0,0 +1,82 @@
+import hashlib
+import json
+from functools import partial
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from mow_api import caching
+
+
+def validator_fields(ordering):
+    return {"id", "updated_at", *(field.lstrip("-") for field in ordering)}
+
+
+def list_validators(request, paginator, rows, keys, current):
+    """
+    The ``ETag`` and ``Last-Modified`` of a listing page, from its ``rows``
+    and the ``current`` generations of their ``keys``.
+    """
+    state = {
+        "url": request.build_absolute_uri(),
+        "user": request.user.pk,
+        "has_next": paginator.has_next,
+        "has_previous": paginator.has_previous,
+        "rows": [
+            [row.id, row.updated_at.isoformat(), current[key]]
+            for row, key in zip(rows, keys)
+        ],
+    }
+    digest = hashlib.sha256(json.dumps(state).encode()).hexdigest()
+
+    timestamps = [row.updated_at.timestamp() for row in rows]
+    timestamps += [generation / 1e9 for generation in current.values()]
+    last_modified = int(max(timestamps)) if timestamps else None
+    return f'"{digest}"', last_modified
+
+
+class ConditionalListMixin:
+    """
+    Answer ``list`` requests carrying ``If-None-Match`` or ``If-Modified-Since``
+    with a 304 before anything is serialized.
+
+    The validators are computed from the page's ``(id, updated_at)`` rows and
+    the generation counter of each row, which changes with its votes and
+    comments. That costs one narrow query and one cache lookup.
+    """
+
+    def get_validator_queryset(self):
+        return self.get_queryset()
+
+    def get_generation_key(self, object_id):
+        return caching.fact_key(object_id)
+
+    def get_list_validators(self, request):
+        ordering = self.paginator.get_ordering(request)
+        queryset = self.filter_queryset(self.get_validator_queryset())
+        queryset = queryset.only(*validator_fields(ordering))
+        rows = self.paginator.paginate_queryset(queryset, request, view=self)
+
+        keys = [self.get_generation_key(row.id) for row in rows]
+        current = caching.generations(keys)
+        return list_validators(request, self.paginator, rows, keys, current)
+
+    def list(self, request, *args, **kwargs):
+        self.list_validators = self.get_list_validators(request)
+        build = partial(super().list, request, *args, **kwargs)
+        return self.conditional_response(request, *self.list_validators, build)
+
+    def conditional_response(self, request, etag, last_modified, build):
+        """
+        A 304 when the request's validators match, otherwise what ``build``
+        returns, either way with the list validators in the headers.
+        """
+        result = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if result is None:
+            result = build()
+        result["ETag"] = etag
+        if last_modified is not None:
+            result["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(result, ["Authorization"])
+        return result
@@ -0,0 +1,238 @@
+"""
+Streaming exports of fun facts, comments and votes for analytics.
+
+An ``Export`` reads its table through a server-side cursor
+(``.iterator(chunk_size=...)``) and encodes one chunk of rows at a time, so
+memory stays bounded by the chunk size whatever the size of the table. The
+export endpoint streams the chunks out as they are encoded, the
+``export_meadows`` command writes them to a file. Under ASGI the endpoint
+streams ``astream`` instead: Django reads a sync iterator in full before
+sending it to an ASGI server.
+
+Rows come in ``id`` order. An interrupted export resumes with ``since`` set to
+the last ``id`` it received. With an ISO 8601 timestamp instead, ``since``
+exports the rows edited since then in ``updated_at`` order, for incremental
+pulls. Rows edited exactly at ``since`` are exported again, so consumers
+should deduplicate by ``id``. Vote and comment counters do not change
+``updated_at``.
+"""
+import csv
+import io
+from itertools import islice
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from mow_api.camel import camel_key
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+from mow_api.readers import ValuesReader
+from rest_framework import renderers
+
+FORMATS = ("ndjson", "csv")
+
+
+def parse_since(value):
+    """
+    Return ``value`` as an ``int`` id or an aware ``datetime``, ``None`` when
+    it is empty. Raises ``ValueError`` for anything else.
+    """
+    if value is None or value == "":
+        return None
+    if value.isdigit():
+        return int(value)
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        since = None
+    if since is None:
+        raise ValueError("Expected an id or an ISO 8601 timestamp.")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class Export(ValuesReader):
+    model = None
+    timestamp_field = "updated_at"
+
+    def __init__(self, since=None):
+        super().__init__({})
+        if since is not None and not isinstance(since, int):
+            if self.timestamp_field is None:
+                raise ValueError("Expected an id.")
+        self.since = since
+
+    @property
+    def columns(self):
+        return [camel_key(name) for name, _ in self.fields]
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def get_rows(self, chunk_size):
+        queryset, ordering = self.get_queryset(), ["id"]
+        if isinstance(self.since, int):
+            queryset = queryset.filter(id__gt=self.since)
+        elif self.since is not None:
+            queryset = queryset.filter(**{f"{self.timestamp_field}__gte": self.since})
+            ordering = [self.timestamp_field, "id"]
+        rows = self.values(queryset.order_by(*ordering), ordering)
+        return rows.iterator(chunk_size=chunk_size)
+
+    def stream(self, format="ndjson", chunk_size=2000):
+        """
+        Yield the export encoded as ``format``, one chunk of ``chunk_size``
+        rows at a time.
+        """
+        encoder = ENCODERS[format](self.columns)
+        yield encoder.header()
+        rows = self.get_rows(chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            yield encoder.encode(self.to_representation(chunk))
+
+    async def astream(self, format="ndjson", chunk_size=2000):
+        """
+        ``stream`` for ASGI. Each chunk is read and encoded in a thread, one
+        at a time.
+        """
+        chunks = self.stream(format, chunk_size)
+        next_chunk = sync_to_async(next)
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+
+
+class FunFactExport(Export):
+    model = FunFact
+    fields = (
+        ("id", "id"),
+        ("user_id", "author_id"),
+        ("fact_text", "fact_text"),
+        ("count_votes", "score"),
+        ("upvote_count", "upvote_count"),
+        ("downvote_count", "downvote_count"),
+        ("comment_count", "comment_count"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    )
+
+    def get_queryset(self):
+        return super().get_queryset().with_sharded_counters()
+
+
+class CommentExport(Export):
+    model = FunFactComment
+    fields = (
+        ("id", "id"),
+        ("fact_id", "fact_id"),
+        ("parent_id", "parent_id"),
+        ("depth", "depth"),
+        ("user_id", "author_id"),
+        ("comment_text", "comment_text"),
+        ("count_votes", "score"),
+        ("upvote_count", "upvote_count"),
+        ("downvote_count", "downvote_count"),
+        ("reply_count", "reply_count"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    )
+
+    def get_queryset(self):
+        return super().get_queryset().with_sharded_counters()
+
+
+class VoteExport(Export):
+    model = FunFactVote
+    timestamp_field = None
+    datetime_fields = ()
+    fields = (
+        ("id", "id"),
+        ("user_id", "author_id"),
+        ("target", "content_type_id"),
+        ("object_id", "object_id"),
+        ("vote", "vote"),
+    )
+
+    def to_representation(self, rows):
+        targets = {
+            ContentType.objects.get_for_model(FunFact).id: "fact",
+            ContentType.objects.get_for_model(FunFactComment).id: "comment",
+        }
+        data = super().to_representation(rows)
+        for item in data:
+            item["target"] = targets[item["target"]]
+        return data
+
+
+EXPORTS = {
+    "facts": FunFactExport,
+    "comments": CommentExport,
+    "votes": VoteExport,
+}
+
+
+class NDJSONEncoder:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def header(self):
+        return b""
+
+    def encode(self, items):
+        return b"".join(orjson.dumps(item) + b"\n" for item in items)
+
+
+class CSVEncoder:
+    def __init__(self, columns):
+        self.columns = columns
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def flush(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data.encode()
+
+    def header(self):
+        self.writer.writerow(self.columns)
+        return self.flush()
+
+    def encode(self, items):
+        self.writer.writerows(
+            [item[column] for column in self.columns] for item in items
+        )
+        return self.flush()
+
+
+ENCODERS = {"ndjson": NDJSONEncoder, "csv": CSVEncoder}
+
+
+class ExportRenderer(renderers.BaseRenderer):
+    """
+    Picks the export format in content negotiation, with ``?format=`` or the
+    ``Accept`` header. Exports are streamed past it, it only renders errors.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        item = {
+            key: " ".join(value) if isinstance(value, list) else value
+            for key, value in data.items()
+        }
+        encoder = ENCODERS[self.format](list(item))
+        return encoder.header() + encoder.encode([item])
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
@@ -0,0 +1,28 @@
+"""
+Django's password hashers with the cost of the preferred one, picked by
+``PASSWORD_HASHER``, taken from ``PASSWORD_HASH_COST``: the PBKDF2 iterations,
+the scrypt work factor or the Argon2 time cost. The algorithm names are
+Django's, so hashes made before or with other costs still verify and are
+upgraded to the preferred hasher on the next login.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def cost(name, default):
+    if settings.PASSWORD_HASHER != name or not settings.PASSWORD_HASH_COST:
+        return default
+    return settings.PASSWORD_HASH_COST
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = cost("pbkdf2", hashers.PBKDF2PasswordHasher.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = cost("scrypt", hashers.ScryptPasswordHasher.work_factor)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    # Needs argon2-cffi.
+    time_cost = cost("argon2", hashers.Argon2PasswordHasher.time_cost)
@@ -0,0 +1,221 @@
+"""
+Bulk loading of fun facts, comments and votes, the counterpart of
+``mow_api.export`` for seeding load tests and refreshing staging.
+
+Rows are read as a stream of NDJSON or CSV in the export's layout and
+inserted a batch at a time, with ``bulk_create`` or with PostgreSQL's
+``COPY``. Neither runs ``save()`` nor the ``post_save`` counters, so the
+``import_meadows`` command rebuilds the derived columns once at the end:
+comment paths, comment and vote counters, hot scores and search vectors.
+
+Facts and comments keep the ``id`` they are imported with, so comments and
+votes can refer to them. Parents are linked as imported: the foreign keys
+are checked when the import commits, so replies may come before their
+parent. Votes get new ids.
+"""
+import csv
+import io
+from contextlib import contextmanager
+from itertools import islice
+
+import orjson
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from mow_api.camel import camel_key
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+
+
+def read_rows(stream, format):
+    """
+    Yield the rows of a binary ``stream`` of NDJSON or CSV as dicts. Empty
+    CSV cells are ``None``, like nulls in NDJSON.
+    """
+    if format == "ndjson":
+        for line in stream:
+            if line.strip():
+                yield orjson.loads(line)
+        return
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+    for row in reader:
+        yield {key: value if value != "" else None for key, value in row.items()}
+
+
+def parse_timestamp(value):
+    if value is None:
+        return timezone.now()
+    timestamp = parse_datetime(value)
+    if timestamp is None:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    return timestamp
+
+
+@contextmanager
+def explicit_timestamps(model):
+    """
+    Keep the imported ``created_at`` and ``updated_at`` in ``bulk_create``,
+    which otherwise stamps ``auto_now`` fields with the current time.
+    """
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def copy_value(value):
+    """
+    ``value`` in the text format of ``COPY``.
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class Loader:
+    """
+    Input fields as ``(name, attname)`` pairs, read from the camelCase
+    ``name`` keys of the export.
+    """
+
+    model = None
+    fields = ()
+    integer_fields = ()
+    datetime_fields = ("created_at", "updated_at")
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.keys = [(camel_key(name), attname) for name, attname in self.fields]
+
+    def build(self, row):
+        values = {}
+        for key, attname in self.keys:
+            value = row.get(key)
+            if attname in self.datetime_fields:
+                value = parse_timestamp(value)
+            elif attname in self.integer_fields and value is not None:
+                value = int(value)
+            values[attname] = value
+        return self.model(**values)
+
+    def load(self, rows, batch_size, copy=False):
+        """
+        Insert ``rows`` in batches of ``batch_size`` and return their number.
+        """
+        insert = self.copy if copy else self.bulk_create
+        rows, total = iter(rows), 0
+        while batch := [self.build(row) for row in islice(rows, batch_size)]:
+            insert(batch)
+            total += len(batch)
+        if self.model._meta.pk.attname in dict(self.keys).values():
+            self.reset_sequence()
+        return total
+
+    def bulk_create(self, objects):
+        with explicit_timestamps(self.model):
+            self.model.objects.bulk_create(objects)
+
+    def copy(self, objects):
+        fields = [
+            field
+            for field in self.model._meta.concrete_fields
+            if not (field.primary_key and getattr(objects[0], field.attname) is None)
+        ]
+        buffer = io.StringIO()
+        for obj in objects:
+            values = [
+                field.get_db_prep_save(getattr(obj, field.attname), self.connection)
+                for field in fields
+            ]
+            buffer.write("\t".join(copy_value(value) for value in values) + "\n")
+        buffer.seek(0)
+        quote = self.connection.ops.quote_name
+        columns = ", ".join(quote(field.column) for field in fields)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(self.model._meta.db_table)} ({columns}) FROM STDIN",
+                buffer,
+            )
+
+    def reset_sequence(self):
+        statements = self.connection.ops.sequence_reset_sql(no_style(), [self.model])
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+class FunFactLoader(Loader):
+    model = FunFact
+    fields = (
+        ("id", "id"),
+        ("user_id", "author_id"),
+        ("fact_text", "fact_text"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    )
+    integer_fields = ("id", "author_id")
+
+
+class CommentLoader(Loader):
+    model = FunFactComment
+    fields = (
+        ("id", "id"),
+        ("fact_id", "fact_id"),
+        ("parent_id", "parent_id"),
+        ("user_id", "author_id"),
+        ("comment_text", "comment_text"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    )
+    integer_fields = ("id", "fact_id", "parent_id", "author_id")
+
+
+class VoteLoader(Loader):
+    model = FunFactVote
+    datetime_fields = ()
+    fields = (
+        ("user_id", "author_id"),
+        ("target", "content_type_id"),
+        ("object_id", "object_id"),
+        ("vote", "vote"),
+    )
+    integer_fields = ("author_id", "object_id")
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.targets = {
+            "fact": ContentType.objects.get_for_model(FunFact).id,
+            "comment": ContentType.objects.get_for_model(FunFactComment).id,
+        }
+
+    def build(self, row):
+        vote = super().build(row)
+        try:
+            vote.content_type_id = self.targets[vote.content_type_id]
+        except KeyError:
+            raise ValueError(f"Invalid vote target: {vote.content_type_id!r}")
+        return vote
+
+
+LOADERS = {
+    "facts": FunFactLoader,
+    "comments": CommentLoader,
+    "votes": VoteLoader,
+}
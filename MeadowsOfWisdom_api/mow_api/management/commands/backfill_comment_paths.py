@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat, LPad
+from mow_api.models import FunFactComment
+
+PENDING = "?"
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the materialized path and depth of every comment, "
+        "one tree level per UPDATE."
+    )
+
+    def handle(self, *args, **options):
+        comments = FunFactComment.objects.all()
+        parent = FunFactComment.objects.filter(pk=OuterRef("parent_id"))
+        segment = LPad(Cast("parent_id", models.TextField()), 10, Value("0"))
+        path = Concat(
+            Subquery(parent.values("path")),
+            segment,
+            Value("/"),
+            output_field=models.TextField(),
+        )
+        depth = Subquery(parent.values("depth")) + 1
+
+        with transaction.atomic():
+            roots = comments.filter(parent=None).update(path="", depth=0)
+            self.stdout.write(f"Level 0: {roots} comments")
+            comments.exclude(parent=None).update(path=PENDING)
+            level = 0
+            while True:
+                updated = (
+                    comments.filter(path=PENDING)
+                    .exclude(parent__path=PENDING)
+                    .update(path=path, depth=depth)
+                )
+                if not updated:
+                    break
+                level += 1
+                self.stdout.write(f"Level {level}: {updated} comments")
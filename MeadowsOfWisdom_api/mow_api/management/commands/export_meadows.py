@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from mow_api.export import EXPORTS, FORMATS, parse_since
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream fun facts, comments or votes to a file as NDJSON or CSV with "
+        "bounded memory. --since resumes after an id or exports the rows "
+        "updated since an ISO 8601 timestamp."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=list(EXPORTS))
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument("--since", default=None)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--output", default="-", help="file to write, - for standard output"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            export = EXPORTS[options["dataset"]](parse_since(options["since"]))
+        except ValueError as error:
+            raise CommandError(f"--since: {error}")
+
+        chunks = export.stream(options["format"], options["chunk_size"])
+        if options["output"] != "-":
+            with open(options["output"], "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            return
+        for chunk in chunks:
+            self.stdout.write(chunk.decode(), ending="")
+        self.stdout.flush()
@@ -0,0 +1,71 @@
+import sys
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.postgres.search import SearchVector
+from django.db import DatabaseError, connection, transaction
+from mow_api import caching
+from mow_api.export import FORMATS
+from mow_api.imports import LOADERS, read_rows
+from mow_api.models import SEARCH_CONFIG, FunFact, FunFactComment
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk load fun facts, comments and votes from NDJSON or CSV files in "
+        "the export_meadows layout, in one transaction, then rebuild comment "
+        "paths, counters, hot scores and search vectors. The authors must "
+        "exist already."
+    )
+
+    def add_arguments(self, parser):
+        for dataset in LOADERS:
+            parser.add_argument(
+                f"--{dataset}", metavar="FILE", help=f"{dataset} to load, - for stdin"
+            )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="format of the files, by default guessed from their extension",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--copy", action="store_true", help="insert with COPY, not bulk_create"
+        )
+
+    def handle(self, *args, **options):
+        files = [(dataset, options[dataset]) for dataset in LOADERS if options[dataset]]
+        if not files:
+            raise CommandError(f"Nothing to load, pass one of --{', --'.join(LOADERS)}")
+
+        try:
+            with transaction.atomic():
+                for dataset, path in files:
+                    loaded = self.load(dataset, path, options)
+                    self.stdout.write(f"Loaded {loaded} {dataset}")
+                with connection.cursor() as cursor:
+                    # Check the deferred foreign keys, parents included, now.
+                    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+                self.rebuild()
+                caching.bump_on_commit(caching.LIST, caching.RANKING)
+        except (ValueError, DatabaseError) as error:
+            raise CommandError(f"Import failed, nothing was loaded: {error!r}")
+
+    def load(self, dataset, path, options):
+        format = options["format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        loader = LOADERS[dataset](connection)
+        if path == "-":
+            rows = read_rows(sys.stdin.buffer, format)
+            return loader.load(rows, options["batch_size"], options["copy"])
+        with open(path, "rb") as stream:
+            rows = read_rows(stream, format)
+            return loader.load(rows, options["batch_size"], options["copy"])
+
+    def rebuild(self):
+        call_command("backfill_comment_paths", stdout=self.stdout)
+        call_command("recount_comments", stdout=self.stdout)
+        call_command("recount_votes", stdout=self.stdout)
+        for model in (FunFact, FunFactComment):
+            model.objects.filter(search_vector=None).update(
+                search_vector=SearchVector(model.search_field, config=SEARCH_CONFIG)
+            )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from mow_api.models import FunFact, FunFactComment
+
+
+def tally(field):
+    return Coalesce(
+        Subquery(
+            FunFactComment.objects.filter(**{field: OuterRef("pk")})
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored comment and reply counters."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            facts = FunFact.objects.update(comment_count=tally("fact"))
+            comments = FunFactComment.objects.update(reply_count=tally("parent"))
+        self.stdout.write(f"Recounted comments for {facts} fun facts")
+        self.stdout.write(f"Recounted replies for {comments} comments")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from mow_api.models import FunFact, FunFactComment
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored vote counters of fun facts and comments."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model in (FunFact, FunFactComment):
+                updated = model.objects.recount_votes()
+                self.stdout.write(
+                    f"Recounted votes for {updated} {model._meta.verbose_name_plural}"
+                )
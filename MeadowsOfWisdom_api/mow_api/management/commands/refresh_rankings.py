@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from mow_api.models import FunFact, FunFactComment
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the counter shards of hot fun facts and comments into their rows "
+        "and refresh their scores and hot scores. Run it every few minutes when "
+        "counter sharding is enabled."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model in (FunFact, FunFactComment):
+                folded = model.objects.filter(
+                    sharded_counters=True
+                ).fold_counter_shards()
+                self.stdout.write(
+                    f"Refreshed {folded} {model._meta.verbose_name_plural}"
+                )
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_counters(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    FunFactVote = apps.get_model("mow_api", "FunFactVote")
+    for model_name in ("funfact", "funfactcomment"):
+        model = apps.get_model("mow_api", model_name)
+        try:
+            content_type = ContentType.objects.get(
+                app_label="mow_api", model=model_name
+            )
+        except ContentType.DoesNotExist:
+            continue
+        votes = FunFactVote.objects.filter(
+            content_type=content_type, object_id=OuterRef("pk")
+        )
+
+        def tally(vote):
+            return Coalesce(
+                Subquery(
+                    votes.filter(vote=vote)
+                    .values("object_id")
+                    .annotate(total=Count("pk"))
+                    .values("total")
+                ),
+                Value(0),
+            )
+
+        model.objects.update(
+            upvote_count=tally("upvote"),
+            downvote_count=tally("downvote"),
+            score=tally("upvote") - tally("downvote"),
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mow_api", "0008_remove_funfact_downvote_remove_funfact_upvote"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="funfact",
+            name="downvote_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="funfact",
+            name="score",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="funfact",
+            name="upvote_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="downvote_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="score",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="upvote_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
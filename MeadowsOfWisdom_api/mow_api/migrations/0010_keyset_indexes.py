@@ -0,0 +1,26 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mow_api", "0009_vote_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="funfact",
+            index=models.Index(fields=["created_at", "id"], name="funfact_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="funfact",
+            index=models.Index(fields=["score", "id"], name="funfact_score_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="funfactcomment",
+            index=models.Index(
+                fields=["fact", "created_at", "id"], name="comment_fact_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mow_api", "0010_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="funfactcomment",
+            index=models.Index(
+                fields=["fact", "parent", "created_at"], name="comment_thread_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="funfactvote",
+            index=models.Index(
+                fields=["content_type", "object_id", "vote"], name="vote_target_idx"
+            ),
+        ),
+    ]
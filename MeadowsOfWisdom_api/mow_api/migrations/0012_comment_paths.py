@@ -0,0 +1,56 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:32
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat, LPad
+
+PENDING = "?"
+
+
+def backfill_comment_paths(apps, schema_editor):
+    FunFactComment = apps.get_model("mow_api", "FunFactComment")
+    comments = FunFactComment.objects.all()
+    parent = FunFactComment.objects.filter(pk=OuterRef("parent_id"))
+    segment = LPad(Cast("parent_id", models.TextField()), 10, Value("0"))
+    path = Concat(
+        Subquery(parent.values("path")),
+        segment,
+        Value("/"),
+        output_field=models.TextField(),
+    )
+    depth = Subquery(parent.values("depth")) + 1
+
+    # One UPDATE per tree level, roots already have the defaults.
+    comments.exclude(parent=None).update(path=PENDING)
+    while (
+        comments.filter(path=PENDING)
+        .exclude(parent__path=PENDING)
+        .update(path=path, depth=depth)
+    ):
+        pass
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mow_api", "0011_vote_and_thread_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="path",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="funfactcomment",
+            index=models.Index(
+                fields=["path"], name="comment_path_idx", opclasses=["text_pattern_ops"]
+            ),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+    ]
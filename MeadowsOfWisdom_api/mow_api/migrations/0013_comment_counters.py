@@ -0,0 +1,44 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_counters(apps, schema_editor):
+    FunFact = apps.get_model("mow_api", "FunFact")
+    FunFactComment = apps.get_model("mow_api", "FunFactComment")
+
+    def tally(field):
+        return Coalesce(
+            Subquery(
+                FunFactComment.objects.filter(**{field: OuterRef("pk")})
+                .values(field)
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            Value(0),
+        )
+
+    FunFact.objects.update(comment_count=tally("fact"))
+    FunFactComment.objects.update(reply_count=tally("parent"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mow_api", "0012_comment_paths"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="funfact",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="reply_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_comment_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("mow_api", "0013_comment_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="funfact",
+            name="sharded_counters",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="sharded_counters",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name="VoteCounterShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("upvote_count", models.IntegerField(default=0)),
+                ("downvote_count", models.IntegerField(default=0)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("content_type", "object_id", "shard")},
+            },
+        ),
+    ]
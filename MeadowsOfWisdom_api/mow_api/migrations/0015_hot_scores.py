@@ -0,0 +1,49 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:48
+
+from django.db import migrations, models
+from django.db.models import F, Value
+
+# Hot ranking of a vote score, mirrored by mow_api.models.hot_score.
+CREATE_HOT_SCORE_FUNCTION = """
+CREATE FUNCTION vote_hot_score(
+    score bigint, created_at timestamp with time zone, gravity double precision
+) RETURNS double precision AS $$
+    SELECT SIGN(score) * LOG(GREATEST(ABS(score), 1))
+        + EXTRACT(EPOCH FROM created_at)::double precision / gravity
+$$ LANGUAGE SQL IMMUTABLE
+"""
+
+DROP_HOT_SCORE_FUNCTION = "DROP FUNCTION vote_hot_score"
+
+
+def backfill_hot_scores(apps, schema_editor):
+    hot_score = models.Func(
+        F("score"), F("created_at"), Value(45000), function="vote_hot_score"
+    )
+    for name in ("FunFact", "FunFactComment"):
+        apps.get_model("mow_api", name).objects.update(hot_score=hot_score)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mow_api", "0014_vote_counter_shards"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_HOT_SCORE_FUNCTION, DROP_HOT_SCORE_FUNCTION),
+        migrations.AddField(
+            model_name="funfact",
+            name="hot_score",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="hot_score",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_hot_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="funfact",
+            index=models.Index(fields=["hot_score", "id"], name="funfact_hot_idx"),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.4 on 2026-10-18 07:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def backfill_search_vectors(apps, schema_editor):
+    fields = {"FunFact": "fact_text", "FunFactComment": "comment_text"}
+    for name, field in fields.items():
+        apps.get_model("mow_api", name).objects.update(
+            search_vector=django.contrib.postgres.search.SearchVector(
+                field, config="english"
+            )
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mow_api", "0015_hot_scores"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="funfact",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="funfactcomment",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="funfact",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="funfact_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="funfactcomment",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="comment_search_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.4 on 2026-10-18 09:02
+
+from django.db import migrations
+
+# auth.User belongs to django.contrib.auth, so its index for the users
+# listing is created here. Username prefixes are served by the
+# varchar_pattern_ops index Django already keeps on auth_user.username.
+CREATE_USER_JOINED_INDEX = "CREATE INDEX user_joined_idx ON auth_user (date_joined, id)"
+
+DROP_USER_JOINED_INDEX = "DROP INDEX user_joined_idx"
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("mow_api", "0016_search_vectors"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_USER_JOINED_INDEX, DROP_USER_JOINED_INDEX),
+    ]
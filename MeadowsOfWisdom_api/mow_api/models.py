@@ -1,15 +1,323 @@
+import math
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import connections, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.query import ModelIterable
+from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericRelation
 from django.contrib.contenttypes.fields import GenericForeignKey
+from mow_api import sharding
+
+# Text search configuration of the search vectors and queries.
+SEARCH_CONFIG = "english"
+# Wrapped around the matches in search headlines, see HeadlineField.
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+
+# Seconds of age that weigh as much as a tenfold score in the hot ranking.
+HOT_SCORE_GRAVITY = 45000
+
+
+def hot_score(score, created_at):
+    """
+    Time-decayed popularity: the order of magnitude of the score plus the age
+    bonus of ``created_at``. Newer objects start higher, so the scores never
+    need to be decayed, only recomputed when the score changes.
+
+    The database computes it with the ``vote_hot_score`` function from
+    migration 0015, see ``HotScore``.
+    """
+    sign = (score > 0) - (score < 0)
+    return sign * math.log10(max(abs(score), 1)) + (
+        created_at.timestamp() / HOT_SCORE_GRAVITY
+    )
+
+
+class HotScore(models.Func):
+    function = "vote_hot_score"
+    output_field = models.FloatField()
+
+    def __init__(self, score, created_at="created_at", **extra):
+        super().__init__(score, created_at, Value(HOT_SCORE_GRAVITY), **extra)
+
+
+class ShardedCountersIterable(ModelIterable):
+    """
+    Add the ``shard_upvotes`` and ``shard_downvotes`` annotations to the
+    counters of every loaded object. The stored counters stay available as
+    ``stored_counters``, which is what the database sorts by.
+    """
+
+    def __iter__(self):
+        for obj in super().__iter__():
+            up = obj.__dict__.pop("shard_upvotes")
+            down = obj.__dict__.pop("shard_downvotes")
+            obj.stored_counters = {
+                "upvote_count": obj.upvote_count,
+                "downvote_count": obj.downvote_count,
+                "score": obj.score,
+            }
+            obj.upvote_count += up
+            obj.downvote_count += down
+            obj.score += up - down
+            yield obj
+
+
+class VoteCountedQuerySet(models.QuerySet):
+    def with_listing_data(self, user):
+        """
+        Load everything a listing serializer needs in one query: the author row,
+        the complete counters and, for authenticated users, their own vote on
+        each object.
+        """
+        queryset = self.select_related("author").with_sharded_counters()
+        if user is None or not user.is_authenticated:
+            return queryset
+        content_type = ContentType.objects.get_for_model(self.model)
+        viewer_vote = FunFactVote.objects.filter(
+            content_type=content_type, object_id=OuterRef("pk"), author=user
+        ).values("vote")[:1]
+        return queryset.annotate(viewer_vote=Subquery(viewer_vote))
+
+    def with_sharded_counters(self):
+        """
+        Include the counter shards of promoted objects in the loaded counters.
+        The shards are only summed for promoted rows, the others cost nothing.
+        """
+        content_type = ContentType.objects.get_for_model(self.model)
+        shards = VoteCounterShard.objects.filter(
+            content_type=content_type, object_id=OuterRef("pk")
+        ).values("object_id")
+
+        def total(field):
+            return Case(
+                When(
+                    sharded_counters=True,
+                    then=Coalesce(
+                        Subquery(shards.annotate(total=Sum(field)).values("total")),
+                        Value(0),
+                    ),
+                ),
+                default=Value(0),
+            )
+
+        queryset = self.annotate(
+            shard_upvotes=total("upvote_count"),
+            shard_downvotes=total("downvote_count"),
+        )
+        queryset._iterable_class = ShardedCountersIterable
+        return queryset
+
+    def search(self, text):
+        """
+        Objects matching ``text``, in web search syntax, annotated with their
+        ``rank`` and a ``headline`` marking the matches. The match is a scan of
+        the GIN index on ``search_vector``.
+        """
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+        return self.filter(search_vector=query).annotate(
+            # Ranks are real, cast them so cursors round-trip them exactly.
+            rank=Cast(SearchRank(F("search_vector"), query), models.FloatField()),
+            headline=SearchHeadline(
+                self.model.search_field,
+                query,
+                config=SEARCH_CONFIG,
+                start_sel=HIGHLIGHT_START,
+                stop_sel=HIGHLIGHT_STOP,
+            ),
+        )
+
+    def recount_votes(self):
+        """
+        Recompute the stored vote counters from FunFactVote in a single UPDATE
+        and drop the counter shards they now include.
+        """
+        content_type = ContentType.objects.get_for_model(self.model)
+        VoteCounterShard.objects.filter(
+            content_type=content_type, object_id__in=self.values("pk")
+        ).delete()
+        votes = FunFactVote.objects.filter(
+            content_type=content_type, object_id=OuterRef("pk")
+        )
 
+        def tally(vote):
+            return Coalesce(
+                Subquery(
+                    votes.filter(vote=vote)
+                    .values("object_id")
+                    .annotate(total=Count("pk"))
+                    .values("total")
+                ),
+                Value(0),
+            )
+
+        upvotes = tally(FunFactVote.VoteType.UPVOTE)
+        downvotes = tally(FunFactVote.VoteType.DOWNVOTE)
+        return self.update(
+            upvote_count=upvotes,
+            downvote_count=downvotes,
+            score=upvotes - downvotes,
+            hot_score=HotScore(upvotes - downvotes),
+        )
+
+    def fold_counter_shards(self):
+        """
+        Move the counter shards of these objects into their rows and refresh
+        their hot scores, which votes landing in shards leave behind.
+
+        The shards are deleted and summed in the same statement, so votes
+        added to a shard meanwhile wait for it and start a new shard row.
+        """
+        content_type = ContentType.objects.get_for_model(self.model)
+        connection = connections[self.db]
+        objects, params = self.values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                FOLD_SHARDS_SQL.format(
+                    target=connection.ops.quote_name(self.model._meta.db_table),
+                    shards=connection.ops.quote_name(VoteCounterShard._meta.db_table),
+                    objects=objects,
+                ),
+                [content_type.pk, *params, HOT_SCORE_GRAVITY],
+            )
+            return cursor.rowcount
+
+    def apply_vote_deltas(self, deltas):
+        """
+        Apply ``{pk: (upvote_delta, downvote_delta)}`` to many objects with one
+        ``UPDATE``, whatever the number of votes behind each delta. Deltas of
+        objects with sharded counters go to their shards instead.
+        """
+        deltas = {pk: delta for pk, delta in deltas.items() if delta != (0, 0)}
+        if not deltas:
+            return 0
+        sharding.record_writes(self.model, deltas)
+        sharded = set(
+            self.filter(pk__in=deltas, sharded_counters=True).values_list(
+                "pk", flat=True
+            )
+        )
+        if sharded:
+            VoteCounterShard.objects.add(
+                self.model, {pk: deltas.pop(pk) for pk in sharded}
+            )
+        if not deltas:
+            return len(sharded)
+
+        def per_object(position):
+            return Case(
+                *[
+                    When(pk=pk, then=Value(delta[position]))
+                    for pk, delta in deltas.items()
+                ],
+                default=Value(0),
+            )
+
+        upvotes, downvotes = per_object(0), per_object(1)
+        updated = self.filter(pk__in=deltas).update(
+            upvote_count=F("upvote_count") + upvotes,
+            downvote_count=F("downvote_count") + downvotes,
+            score=F("score") + upvotes - downvotes,
+            hot_score=HotScore(F("score") + upvotes - downvotes),
+        )
+        return updated + len(sharded)
+
+
+class CountVoteMixin(models.Model):
+    upvote_count = models.PositiveIntegerField(default=0)
+    downvote_count = models.PositiveIntegerField(default=0)
+    score = models.IntegerField(default=0)
+    hot_score = models.FloatField(default=0, editable=False)
+    # Set once the object is hot enough for its counters to be split across
+    # VoteCounterShard rows, see mow_api/sharding.py.
+    sharded_counters = models.BooleanField(default=False, editable=False)
+    counter_shards = GenericRelation("VoteCounterShard")
+
+    # Only ever changed by F() updates, which saving a loaded object must not
+    # undo with the values it read. Loaded counters also include the shard
+    # totals, see ShardedCountersIterable.
+    counter_fields = (
+        "upvote_count",
+        "downvote_count",
+        "score",
+        "hot_score",
+        "sharded_counters",
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.hot_score = hot_score(self.score, timezone.now())
+        elif kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
 
-class CountVoteMixin:
     def count_votes(self):
-        upvote_count = self.tags.filter(vote="upvote").count()
-        downvote_count = self.tags.filter(vote="downvote").count()
-        return upvote_count - downvote_count
+        return self.score
+
+    def shift_votes(self, removed=None, added=None):
+        """
+        Move the stored counters from the ``removed`` vote value to the ``added``
+        one with an atomic ``F()`` update, so concurrent voters never overwrite
+        each other.
+        """
+        if removed == added:
+            return
+        up = (added == FunFactVote.VoteType.UPVOTE) - (
+            removed == FunFactVote.VoteType.UPVOTE
+        )
+        down = (added == FunFactVote.VoteType.DOWNVOTE) - (
+            removed == FunFactVote.VoteType.DOWNVOTE
+        )
+        if not (up or down):
+            return
+        model = type(self)
+        sharding.record_writes(model, [self.pk])
+        if self.sharded_counters:
+            VoteCounterShard.objects.add(model, {self.pk: (up, down)})
+            return
+        model.objects.filter(pk=self.pk).update(
+            upvote_count=F("upvote_count") + up,
+            downvote_count=F("downvote_count") + down,
+            score=F("score") + up - down,
+            hot_score=HotScore(F("score") + up - down),
+        )
+
+
+class SearchableMixin(models.Model):
+    """
+    Keeps ``search_vector`` in step with the ``search_field`` text on every
+    save. Rows written with ``update()`` or ``bulk_create()`` have to set it
+    themselves.
+    """
+
+    search_field = None
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.search_vector = SearchVector(
+            Value(getattr(self, self.search_field)), config=SEARCH_CONFIG
+        )
+        super().save(*args, **kwargs)
 
 
 class UserVoteMixin:
@@ -25,6 +333,263 @@ class TimeTrackedModel(models.Model):
         abstract = True
 
 
+class CounterShardQuerySet(models.QuerySet):
+    def add(self, model, deltas):
+        """
+        Add ``{pk: (upvote_delta, downvote_delta)}`` to one random shard of each
+        object with a single ``INSERT ... ON CONFLICT``.
+        """
+        content_type_id = ContentType.objects.get_for_model(model).pk
+        rows = [
+            (content_type_id, pk, sharding.pick_shard(), up, down)
+            for pk, (up, down) in deltas.items()
+        ]
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table}
+                    (content_type_id, object_id, shard, upvote_count, downvote_count)
+                VALUES {values}
+                ON CONFLICT (content_type_id, object_id, shard) DO UPDATE SET
+                    upvote_count = {table}.upvote_count + EXCLUDED.upvote_count,
+                    downvote_count = {table}.downvote_count + EXCLUDED.downvote_count
+                """,
+                [value for row in rows for value in row],
+            )
+
+
+class VoteCounterShard(models.Model):
+    """
+    One of the slices the vote counters of a hot fact or comment are split
+    into. A shard holds deltas, so its counters can be negative; only the sum
+    of the object's row and all its shards is meaningful.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    shard = models.PositiveSmallIntegerField()
+    upvote_count = models.IntegerField(default=0)
+    downvote_count = models.IntegerField(default=0)
+
+    objects = CounterShardQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ["content_type", "object_id", "shard"]
+
+
+PUT_VOTE_SQL = """
+WITH target AS (
+    SELECT id, sharded_counters FROM {target} WHERE id = %(object_id)s
+), previous AS (
+    SELECT vote FROM {votes}
+    WHERE author_id = %(author_id)s
+        AND content_type_id = %(content_type_id)s
+        AND object_id = %(object_id)s
+    FOR UPDATE
+), removed AS (
+    DELETE FROM {votes}
+    WHERE %(vote)s::varchar IS NULL
+        AND author_id = %(author_id)s
+        AND content_type_id = %(content_type_id)s
+        AND object_id = %(object_id)s
+), upserted AS (
+    INSERT INTO {votes} (author_id, content_type_id, object_id, vote)
+    SELECT %(author_id)s, %(content_type_id)s, id, %(vote)s FROM target
+    WHERE %(vote)s::varchar IS NOT NULL
+    ON CONFLICT (author_id, content_type_id, object_id)
+    DO UPDATE SET vote = EXCLUDED.vote
+), delta AS (
+    SELECT
+        (CASE WHEN %(vote)s = 'upvote' THEN 1 ELSE 0 END)
+        - (CASE WHEN previous.vote = 'upvote' THEN 1 ELSE 0 END) AS up,
+        (CASE WHEN %(vote)s = 'downvote' THEN 1 ELSE 0 END)
+        - (CASE WHEN previous.vote = 'downvote' THEN 1 ELSE 0 END) AS down
+    FROM (SELECT 1) AS one LEFT JOIN previous ON true
+), counted AS (
+    UPDATE {target} SET
+        upvote_count = upvote_count + delta.up,
+        downvote_count = downvote_count + delta.down,
+        score = score + delta.up - delta.down,
+        hot_score = vote_hot_score(
+            score + delta.up - delta.down, created_at, %(gravity)s
+        )
+    FROM delta, target
+    WHERE {target}.id = target.id AND NOT target.sharded_counters
+    RETURNING upvote_count, downvote_count, score
+), sharded AS (
+    INSERT INTO {shards}
+        (content_type_id, object_id, shard, upvote_count, downvote_count)
+    SELECT %(content_type_id)s, target.id, %(shard)s, delta.up, delta.down
+    FROM target, delta
+    WHERE target.sharded_counters AND (delta.up <> 0 OR delta.down <> 0)
+    ON CONFLICT (content_type_id, object_id, shard) DO UPDATE SET
+        upvote_count = {shards}.upvote_count + EXCLUDED.upvote_count,
+        downvote_count = {shards}.downvote_count + EXCLUDED.downvote_count
+)
+SELECT upvote_count, downvote_count, score FROM counted
+UNION ALL
+SELECT
+    stored.upvote_count + shards.up + delta.up,
+    stored.downvote_count + shards.down + delta.down,
+    stored.score + shards.up - shards.down + delta.up - delta.down
+FROM {target} AS stored
+JOIN target ON stored.id = target.id AND target.sharded_counters
+CROSS JOIN delta
+CROSS JOIN (
+    SELECT
+        COALESCE(SUM(upvote_count), 0) AS up,
+        COALESCE(SUM(downvote_count), 0) AS down
+    FROM {shards}
+    WHERE content_type_id = %(content_type_id)s AND object_id = %(object_id)s
+) AS shards
+"""
+
+# Serializes the votes of one author on one object until the transaction ends,
+# including first votes, which have no row yet for FOR UPDATE to lock.
+LOCK_VOTES_SQL = """
+SELECT pg_advisory_xact_lock(%s, hashtext(concat(%s, ':', object_id)))
+FROM unnest(%s::integer[]) AS object_id
+"""
+
+FOLD_SHARDS_SQL = """
+WITH folded AS (
+    DELETE FROM {shards}
+    WHERE content_type_id = %s AND object_id IN ({objects})
+    RETURNING object_id, upvote_count, downvote_count
+), totals AS (
+    SELECT object_id, SUM(upvote_count) AS up, SUM(downvote_count) AS down
+    FROM folded GROUP BY object_id
+)
+UPDATE {target} SET
+    upvote_count = upvote_count + totals.up,
+    downvote_count = downvote_count + totals.down,
+    score = score + totals.up - totals.down,
+    hot_score = vote_hot_score(
+        score + totals.up - totals.down, created_at, %s
+    )
+FROM totals
+WHERE {target}.id = totals.object_id
+"""
+
+
+class VoteQuerySet(models.QuerySet):
+    def lock_votes(self, author, content_type, object_ids):
+        """
+        Take the transaction-level lock on ``author``'s votes on each object,
+        in id order so concurrent lockers cannot deadlock.
+        """
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                LOCK_VOTES_SQL, [author.pk, content_type.pk, sorted(object_ids)]
+            )
+
+    def put_vote(self, author, model, object_id, vote):
+        """
+        Set ``author``'s vote on an object to ``vote``, or remove it when
+        ``vote`` is ``None``, and move the object's counters along with it.
+
+        Runs as two PostgreSQL statements. The first takes the lock of
+        ``lock_votes``, so concurrent calls for the same author and object
+        apply one after the other. The second reads the previous vote, upserts
+        the vote with ``INSERT ... ON CONFLICT`` or deletes it, and shifts the
+        counters, or a counter shard of a promoted object, by the difference.
+        Returns the new ``(upvote_count, downvote_count, score)``, or ``None``
+        when the object does not exist.
+        """
+        connection = connections[self.db]
+        # Ids past the range of object_id have no votes, and break the casts.
+        low, high = connection.ops.integer_field_range(
+            self.model._meta.get_field("object_id").get_internal_type()
+        )
+        if not low <= object_id <= high:
+            return None
+        content_type = ContentType.objects.get_for_model(model)
+        params = {
+            "author_id": author.pk,
+            "content_type_id": content_type.pk,
+            "object_id": object_id,
+            "vote": vote,
+            "shard": sharding.pick_shard(),
+            "gravity": HOT_SCORE_GRAVITY,
+        }
+        sql = PUT_VOTE_SQL.format(
+            target=connection.ops.quote_name(model._meta.db_table),
+            votes=connection.ops.quote_name(self.model._meta.db_table),
+            shards=connection.ops.quote_name(VoteCounterShard._meta.db_table),
+        )
+        with transaction.atomic(using=self.db), connection.cursor() as cursor:
+            self.lock_votes(author, content_type, [object_id])
+            cursor.execute(sql, params)
+            counters = cursor.fetchone()
+        if counters is not None:
+            sharding.record_writes(model, [object_id])
+        return counters
+
+    def apply_votes(self, author, model, votes):
+        """
+        Apply ``votes``, a mapping of object id to vote value or ``None`` for
+        no vote, cast by ``author`` on objects of ``model``.
+
+        Votes are written by ``write_votes``, then every touched object's
+        counters are shifted once. Returns the ids that exist, the others are
+        skipped. Run it in a transaction.
+        """
+        deltas = self.write_votes(author, model, votes)
+        model.objects.apply_vote_deltas(deltas)
+        return set(deltas)
+
+    def write_votes(self, author, model, votes):
+        """
+        Upsert ``votes`` with one ``bulk_create`` and withdraw the ``None`` ones
+        with one delete, leaving the counters alone. Returns the counter delta
+        of every existing object as ``{pk: (upvote_delta, downvote_delta)}``.
+
+        The previous votes are read under the lock of ``lock_votes``, which
+        holds until the caller's transaction ends.
+        """
+        content_type = ContentType.objects.get_for_model(model)
+        existing = set(model.objects.filter(pk__in=votes).values_list("pk", flat=True))
+        self.lock_votes(author, content_type, existing)
+        mine = self.filter(
+            author=author, content_type=content_type, object_id__in=existing
+        )
+        previous = dict(mine.select_for_update().values_list("object_id", "vote"))
+
+        upserts, removals, deltas = [], [], {}
+        for object_id in existing:
+            vote, before = votes[object_id], previous.get(object_id)
+            deltas[object_id] = (
+                (vote == self.model.VoteType.UPVOTE)
+                - (before == self.model.VoteType.UPVOTE),
+                (vote == self.model.VoteType.DOWNVOTE)
+                - (before == self.model.VoteType.DOWNVOTE),
+            )
+            if vote is None:
+                removals.append(object_id)
+            else:
+                upserts.append(
+                    self.model(
+                        author=author,
+                        content_type=content_type,
+                        object_id=object_id,
+                        vote=vote,
+                    )
+                )
+
+        self.bulk_create(
+            upserts,
+            update_conflicts=True,
+            unique_fields=["author", "content_type", "object_id"],
+            update_fields=["vote"],
+        )
+        if removals:
+            mine.filter(object_id__in=removals).delete()
+        return deltas
+
+
 class FunFactVote(models.Model):
     author = models.ForeignKey(
         User, related_name="votes_author", on_delete=models.CASCADE
@@ -39,21 +604,40 @@ class FunFactVote(models.Model):
 
     vote = models.CharField(max_length=10, choices=VoteType.choices)
 
+    objects = VoteQuerySet.as_manager()
+
     class Meta:
         unique_together = ["author", "content_type", "object_id"]
+        indexes = [
+            models.Index(
+                fields=["content_type", "object_id", "vote"], name="vote_target_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.vote + " " + self.author.username
 
 
-class FunFact(TimeTrackedModel, CountVoteMixin, UserVoteMixin):
+class FunFact(TimeTrackedModel, CountVoteMixin, SearchableMixin, UserVoteMixin):
     author = models.ForeignKey(User, related_name="facts", on_delete=models.CASCADE)
     fact_text = models.TextField()
     tags = GenericRelation(FunFactVote)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    objects = VoteCountedQuerySet.as_manager()
+
+    search_field = "fact_text"
+    counter_fields = CountVoteMixin.counter_fields + ("comment_count",)
 
     class Meta:
         verbose_name = "Fun Fact"
         verbose_name_plural = "Fun Facts"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="funfact_created_idx"),
+            models.Index(fields=["score", "id"], name="funfact_score_idx"),
+            models.Index(fields=["hot_score", "id"], name="funfact_hot_idx"),
+            GinIndex(fields=["search_vector"], name="funfact_search_idx"),
+        ]
 
     def __repr__(self) -> str:
         return f"<FunFact author= {self.author.username} fact_text= {self.fact_text} date= {self.date} >"
@@ -62,7 +646,7 @@ class FunFact(TimeTrackedModel, CountVoteMixin, UserVoteMixin):
         return self.fact_text
 
 
-class FunFactComment(TimeTrackedModel, CountVoteMixin, UserVoteMixin):
+class FunFactComment(TimeTrackedModel, CountVoteMixin, SearchableMixin, UserVoteMixin):
     author = models.ForeignKey(User, related_name="comments", on_delete=models.CASCADE)
     fact = models.ForeignKey(FunFact, related_name="comments", on_delete=models.CASCADE)
     parent = models.ForeignKey(
@@ -70,6 +654,53 @@ class FunFactComment(TimeTrackedModel, CountVoteMixin, UserVoteMixin):
     )
     comment_text = models.TextField()
     tags = GenericRelation(FunFactVote)
+    reply_count = models.PositiveIntegerField(default=0)
+    # Materialized path of the ancestors, root first, e.g. "0000000003/0000000011/"
+    # for a reply to comment 11, itself a reply to comment 3. Fixed-width
+    # segments keep every subtree in one contiguous index range.
+    path = models.TextField(default="", blank=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = VoteCountedQuerySet.as_manager()
+
+    search_field = "comment_text"
+    counter_fields = CountVoteMixin.counter_fields + ("reply_count",)
+    PATH_SEGMENT = "{:010d}/"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["path"], name="comment_path_idx", opclasses=["text_pattern_ops"]
+            ),
+            models.Index(
+                fields=["fact", "created_at", "id"], name="comment_fact_created_idx"
+            ),
+            models.Index(
+                fields=["fact", "parent", "created_at"], name="comment_thread_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="comment_search_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.comment_text
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.parent is not None:
+            self.path = self.parent.descendants_prefix
+            self.depth = self.parent.depth + 1
+        super().save(*args, **kwargs)
+
+    @property
+    def descendants_prefix(self):
+        return self.path + self.PATH_SEGMENT.format(self.pk)
+
+    def get_descendants(self):
+        return FunFactComment.objects.filter(path__startswith=self.descendants_prefix)
+
+    def get_ancestor_ids(self):
+        return [int(segment) for segment in self.path.split("/") if segment]
+
+    def get_ancestors(self):
+        return FunFactComment.objects.filter(pk__in=self.get_ancestor_ids()).order_by(
+            "depth"
+        )
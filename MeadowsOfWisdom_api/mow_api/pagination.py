@@ -0,0 +1,242 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import pagination, response
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination over a ``(field, id)`` key.
+
+    Every page is an index range scan that starts right after the last row of
+    the previous page, so deep pages cost the same as the first one and no
+    ``COUNT(*)`` is ever needed. ``orderings`` maps the values accepted by the
+    ``ordering`` query parameter to the key used for that order.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "limit"
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    orderings = {"new": ("-created_at", "-id")}
+    default_ordering = "new"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        ``paginate_queryset`` for async views.
+        """
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        The page's rows and one more, which tells whether another page follows.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self.flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            position = self.parse_position(queryset.model, self.position)
+            queryset = queryset.filter(self.after(ordering, position))
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return response.Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Which order to list the results in.",
+                "schema": {"type": "string", "enum": list(self.orderings)},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        name = request.query_params.get(self.ordering_query_param)
+        return self.orderings.get(name, self.orderings[self.default_ordering])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        position = [self.key_value(row, field) for field in self.ordering]
+        payload = json.dumps({"p": position, "r": int(reverse)}, default=str)
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+            position = payload["p"]
+            reverse = bool(payload["r"])
+            if len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def parse_position(self, model, position):
+        # Every sorted column is NOT NULL, and JSON lists or objects aren't
+        # values of any of them.
+        if not all(isinstance(value, (str, int, float)) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def key_value(row, field):
+        name = field.lstrip("-")
+        if isinstance(row, dict):
+            return row[name]
+        # Counters loaded with their shards differ from the sorted columns.
+        stored = getattr(row, "stored_counters", {})
+        return stored[name] if name in stored else getattr(row, name)
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith("-") else "-" + field
+
+    @staticmethod
+    def after(ordering, position):
+        """
+        Build ``(a, b) > (x, y)`` in the direction of ``ordering``, written as
+        ``a >= x AND (a > x OR (a = x AND b > y))`` so the leading column can
+        bound the index scan.
+        """
+        (first, second), (first_value, second_value) = ordering, position
+        first_name, second_name = first.lstrip("-"), second.lstrip("-")
+        first_op = "lt" if first.startswith("-") else "gt"
+        second_op = "lt" if second.startswith("-") else "gt"
+        return Q(**{f"{first_name}__{first_op}e": first_value}) & (
+            Q(**{f"{first_name}__{first_op}": first_value})
+            | Q(
+                **{
+                    first_name: first_value,
+                    f"{second_name}__{second_op}": second_value,
+                }
+            )
+        )
+
+
+class FunFactPagination(KeysetPagination):
+    orderings = {
+        "new": ("-created_at", "-id"),
+        "top": ("-score", "-id"),
+        "hot": ("-hot_score", "-id"),
+    }
+
+
+class CommentPagination(KeysetPagination):
+    orderings = {
+        "old": ("created_at", "id"),
+        "new": ("-created_at", "-id"),
+    }
+    default_ordering = "old"
+
+
+class UserPagination(KeysetPagination):
+    orderings = {
+        "new": ("-date_joined", "-id"),
+        "old": ("date_joined", "id"),
+    }
+
+
+class SearchPagination(KeysetPagination):
+    orderings = {"relevance": ("-rank", "-id")}
+    default_ordering = "relevance"
+
+    def parse_position(self, model, position):
+        rank, pk = position
+        try:
+            return [float(rank), int(pk)]
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
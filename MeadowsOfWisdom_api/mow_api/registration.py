@@ -0,0 +1,33 @@
+"""
+Password hashing for sign-ups, off the request threads.
+
+``make_password`` runs Django's ``make_password`` on a process-wide pool of
+``PASSWORD_HASH_WORKERS`` threads. Awaited from an async view under ASGI, the
+event loop keeps serving requests while the hash is computed, and a burst of
+sign-ups queues on the pool instead of taking every worker thread.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+    return _pool
+
+
+async def make_password(raw_password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), hashers.make_password, raw_password)
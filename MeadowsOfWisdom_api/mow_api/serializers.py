@@ -1,9 +1,20 @@
 from django.contrib.auth.models import Group, User
-from mow_api.models import FunFact, FunFactComment, FunFactVote
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.html import escape
+from mow_api import write_behind
+from mow_api.camel import CamelCaseOutputMixin
+from mow_api.models import (
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    FunFact,
+    FunFactComment,
+    FunFactVote,
+)
 from rest_framework import serializers
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(CamelCaseOutputMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
     def create(self, validated_data):
@@ -22,29 +33,88 @@ class GroupSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
-class FunFactSerializer(serializers.ModelSerializer):
+def get_user_reaction(user, obj, reactions=None):
+    if not user.is_authenticated:
+        return None
+    if hasattr(obj, "viewer_vote"):
+        return obj.viewer_vote
+    if reactions is not None:
+        return reactions.get(obj.pk)
+    try:
+        return obj.tags.get(author=user).vote
+    except FunFactVote.DoesNotExist:
+        return None
+
+
+class ReactionListSerializer(serializers.ListSerializer):
+    """
+    Looks up the requesting user's votes for every object on the page in one
+    query and passes them to the child serializer as ``user_reactions``.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+        user = self.context["request"].user
+        pending = [obj.pk for obj in items if not hasattr(obj, "viewer_vote")]
+        if user.is_authenticated and pending:
+            content_type = ContentType.objects.get_for_model(self.child.Meta.model)
+            self.context["user_reactions"] = dict(
+                FunFactVote.objects.filter(
+                    author=user, content_type=content_type, object_id__in=pending
+                ).values_list("object_id", "vote")
+            )
+        return super().to_representation(items)
+
+
+class ParentIdField(serializers.IntegerField):
+    """
+    Reads the raw ``parent_id`` column so listing comments never loads the
+    parent row, while writes keep going through ``parent.id``.
+    """
+
+    def get_attribute(self, instance):
+        return instance.parent_id
+
+
+class BufferedVotesMixin:
+    """
+    Show the requesting user's votes that still sit in the write-behind buffer.
+    """
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        buffer = write_behind.get_buffer()
+        if buffer is None:
+            return data
+        user = self.context["request"].user
+        return buffer.overlay(user, self.Meta.model, instance.pk, data)
+
+
+class FunFactSerializer(
+    CamelCaseOutputMixin, BufferedVotesMixin, serializers.ModelSerializer
+):
     username = serializers.CharField(source="author.username", read_only=True)
     user_id = serializers.IntegerField(source="author.id", read_only=True)
-    count_votes = serializers.IntegerField(read_only=True)
+    count_votes = serializers.IntegerField(source="score", read_only=True)
     user_reaction = serializers.SerializerMethodField()
 
     def get_user_reaction(self, obj):
-        user = self.context["request"].user
-        if user.is_authenticated:
-            try:
-                return obj.tags.get(author=user).vote
-            except FunFactVote.DoesNotExist:
-                return None
-        return None
+        return get_user_reaction(
+            self.context["request"].user, obj, self.context.get("user_reactions")
+        )
 
     class Meta:
         model = FunFact
+        list_serializer_class = ReactionListSerializer
         fields = [
             "id",
             "username",
             "user_id",
             "fact_text",
             "count_votes",
+            "upvote_count",
+            "downvote_count",
+            "comment_count",
             "user_reaction",
             "created_at",
             "updated_at",
@@ -52,37 +122,41 @@ class FunFactSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "id",
             "count_votes",
-            "upvote",
-            "downvote",
+            "upvote_count",
+            "downvote_count",
+            "comment_count",
             "created_at",
             "updated_at",
         ]
 
 
-class FunFactCommentSerializer(serializers.ModelSerializer):
-    parent_id = serializers.IntegerField(source="parent.id", allow_null=True)
+class FunFactCommentSerializer(
+    CamelCaseOutputMixin, BufferedVotesMixin, serializers.ModelSerializer
+):
+    parent_id = ParentIdField(source="parent.id", allow_null=True)
     username = serializers.CharField(source="author.username", read_only=True)
     user_id = serializers.IntegerField(source="author.id", read_only=True)
-    count_votes = serializers.IntegerField(read_only=True)
+    count_votes = serializers.IntegerField(source="score", read_only=True)
     user_reaction = serializers.SerializerMethodField()
 
     def get_user_reaction(self, obj):
-        user = self.context["request"].user
-        if user.is_authenticated:
-            try:
-                return obj.tags.get(author=user).vote
-            except FunFactVote.DoesNotExist:
-                return None
-        return None
+        return get_user_reaction(
+            self.context["request"].user, obj, self.context.get("user_reactions")
+        )
 
     class Meta:
         model = FunFactComment
+        list_serializer_class = ReactionListSerializer
         fields = [
             "id",
             "parent_id",
+            "depth",
             "username",
             "user_id",
             "count_votes",
+            "upvote_count",
+            "downvote_count",
+            "reply_count",
             "user_reaction",
             "comment_text",
             "created_at",
@@ -90,11 +164,47 @@ class FunFactCommentSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = [
             "id",
+            "upvote_count",
+            "downvote_count",
+            "reply_count",
             "created_at",
             "updated_at",
         ]
 
 
+class HeadlineField(serializers.CharField):
+    """
+    Search headline as HTML: the text is escaped and the matches are wrapped
+    in ``<mark>``.
+    """
+
+    def to_representation(self, value):
+        return (
+            escape(value)
+            .replace(HIGHLIGHT_START, "<mark>")
+            .replace(HIGHLIGHT_STOP, "</mark>")
+        )
+
+
+class SearchResultSerializer(CamelCaseOutputMixin, serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    fact_id = serializers.SerializerMethodField()
+    username = serializers.CharField(source="author.username", read_only=True)
+    user_id = serializers.IntegerField(source="author.id", read_only=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    rank = serializers.FloatField(read_only=True)
+    headline = HeadlineField(read_only=True)
+
+    def get_fact_id(self, obj):
+        return getattr(obj, "fact_id", obj.pk)
+
+
+class VoteOperationSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=["fact", "comment"])
+    id = serializers.IntegerField(min_value=1)
+    vote = serializers.ChoiceField(choices=[*FunFactVote.VoteType.values, "none"])
+
+
 class VoteRelatedField(serializers.RelatedField):
     def to_representation(self, value):
         if isinstance(value, FunFact):
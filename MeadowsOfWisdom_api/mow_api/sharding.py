@@ -0,0 +1,55 @@
+"""
+Sharded vote counters for hot facts and comments.
+
+A vote normally shifts the counters stored on the voted object's row, so all
+voters of one object queue for the same row lock. Once an object takes more
+than ``VOTE_SHARD_PROMOTION_RATE`` votes within a minute it is promoted to
+sharded counters: later votes add their deltas to one of
+``VOTE_COUNTER_SHARDS`` ``VoteCounterShard`` rows picked at random, and reads
+add the shards to the counters on the row.
+
+Promoted objects are never demoted, so a delta written by a voter who saw the
+object before its promotion lands on the row and is still counted.
+"""
+import random
+import time
+
+from django.conf import settings
+from mow_api.caching import get_cache
+
+WINDOW = 60
+
+
+def rate_key(model, object_id, window):
+    return f"votes:rate:{model._meta.label_lower}:{object_id}:{window}"
+
+
+def pick_shard():
+    return random.randrange(settings.VOTE_COUNTER_SHARDS)
+
+
+def record_writes(model, object_ids):
+    """
+    Count a vote write on each of ``object_ids`` and promote the objects that
+    reach the promotion rate in the current window.
+    """
+    threshold = settings.VOTE_SHARD_PROMOTION_RATE
+    if not threshold:
+        return
+    cache = get_cache()
+    window = int(time.time() // WINDOW)
+    hot = []
+    for object_id in object_ids:
+        key = rate_key(model, object_id, window)
+        cache.add(key, 0, timeout=WINDOW * 2)
+        try:
+            writes = cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr, this window starts over.
+            continue
+        if writes == threshold:
+            hot.append(object_id)
+    if hot:
+        model.objects.filter(pk__in=hot, sharded_counters=False).update(
+            sharded_counters=True
+        )
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from mow_api import caching
+from mow_api.authentication import invalidate_user
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+
+
+@receiver(post_save, sender=FunFactComment)
+def increment_comment_counters(sender, instance, created, **kwargs):
+    if not created:
+        caching.invalidate_comment(instance.pk)
+        return
+    caching.invalidate_fact(instance.fact_id)
+    FunFact.objects.filter(pk=instance.fact_id).update(
+        comment_count=F("comment_count") + 1
+    )
+    if instance.parent_id is not None:
+        caching.invalidate_comment(instance.parent_id)
+        FunFactComment.objects.filter(pk=instance.parent_id).update(
+            reply_count=F("reply_count") + 1
+        )
+
+
+@receiver(post_delete, sender=FunFactComment)
+def decrement_comment_counters(sender, instance, **kwargs):
+    """
+    Runs for every deleted comment, including the ones removed by a cascade
+    from their parent, their fact or their author.
+    """
+    caching.invalidate_fact(instance.fact_id)
+    FunFact.objects.filter(pk=instance.fact_id, comment_count__gt=0).update(
+        comment_count=F("comment_count") - 1
+    )
+    if instance.parent_id is not None:
+        caching.invalidate_comment(instance.parent_id)
+        FunFactComment.objects.filter(pk=instance.parent_id, reply_count__gt=0).update(
+            reply_count=F("reply_count") - 1
+        )
+
+
+@receiver(post_save, sender=FunFact)
+def invalidate_saved_fact(sender, instance, created, **kwargs):
+    caching.invalidate_fact(instance.pk, listing=created)
+
+
+@receiver(post_delete, sender=FunFact)
+def invalidate_deleted_fact(sender, instance, **kwargs):
+    caching.invalidate_fact(instance.pk, listing=True, ranking=True)
+
+
+@receiver(post_save, sender=FunFactVote)
+@receiver(post_delete, sender=FunFactVote)
+def invalidate_voted_object(sender, instance, **kwargs):
+    if instance.content_type_id == ContentType.objects.get_for_model(FunFact).id:
+        caching.invalidate_fact(instance.object_id, ranking=True)
+    else:
+        caching.invalidate_comment(instance.object_id)
+
+
+@receiver(pre_delete, sender=User)
+def withdraw_user_votes(sender, instance, **kwargs):
+    """
+    The votes of a deleted user go with them in a cascade that bypasses the
+    vote views, take them off the stored counters before it runs.
+    """
+    for model in (FunFact, FunFactComment):
+        votes = FunFactVote.objects.filter(
+            author=instance, content_type=ContentType.objects.get_for_model(model)
+        )
+        model.objects.apply_vote_deltas(
+            {
+                object_id: (
+                    -(vote == FunFactVote.VoteType.UPVOTE),
+                    -(vote == FunFactVote.VoteType.DOWNVOTE),
+                )
+                for object_id, vote in votes.values_list("object_id", "vote")
+            }
+        )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Password changes and deactivations are saves, drop the cached user so
+    their tokens are checked against the new row.
+    """
+    invalidate_user(instance.pk)
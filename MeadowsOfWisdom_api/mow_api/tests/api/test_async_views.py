@@ -0,0 +1,172 @@
+import base64
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from mow_api.async_views import AsyncFastPathView
+from rest_framework.test import APIClient
+
+HEADERS = ("Content-Type", "ETag", "Last-Modified", "Vary", "Allow")
+
+
+@pytest.fixture
+def no_fallback():
+    with mock.patch.object(
+        AsyncFastPathView, "fallback", side_effect=AssertionError("fallback")
+    ):
+        yield
+
+
+def both_urlconfs(settings, send):
+    settings.ROOT_URLCONF = "MeadowsOfWisdom_api.async_urls"
+    fast = send()
+    settings.ROOT_URLCONF = "MeadowsOfWisdom_api.urls"
+    slow = send()
+    assert fast.status_code == slow.status_code
+    assert fast.content == slow.content
+    for header in HEADERS:
+        assert fast.get(header) == slow.get(header), header
+    return fast
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["", "?ordering=top&limit=2", "?ordering=hot"])
+def test_fact_list_matches_the_drf_view(voted_thread, settings, no_fallback, query):
+    client, _, _ = voted_thread
+    url = reverse("funfacts_test-list") + query
+
+    client.get(url)  # Caches the authenticated user.
+    result = both_urlconfs(settings, lambda: client.get(url))
+
+    assert result.status_code == 200
+    assert result["ETag"]
+
+
+@pytest.mark.django_db
+def test_fact_list_cursors_match_the_drf_view(voted_thread, settings, no_fallback):
+    client, _, _ = voted_thread
+    url = reverse("funfacts_test-list") + "?ordering=top&limit=1"
+
+    while url:
+        url = both_urlconfs(settings, lambda: client.get(url)).json()["next"]
+
+
+@pytest.mark.django_db
+def test_fact_list_answers_conditional_requests(
+    voted_thread, settings, no_fallback, django_capture_on_commit_callbacks
+):
+    client, fact, _ = voted_thread
+    url = reverse("funfacts_test-list")
+    settings.ROOT_URLCONF = "MeadowsOfWisdom_api.async_urls"
+    etag = client.get(url)["ETag"]
+
+    result = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert result.status_code == 304
+    assert result["ETag"] == etag
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.put(reverse("fact_votes", args=[fact.id, "downvote"]))
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_comment_list_matches_the_drf_view(voted_thread, settings, no_fallback):
+    client, fact, _ = voted_thread
+    url = reverse("comments_test-list", kwargs={"fact_id": fact.id})
+
+    result = both_urlconfs(settings, lambda: client.get(url))
+
+    assert [comment["depth"] for comment in result.json()["results"]] == [0, 1]
+
+
+@pytest.mark.django_db
+def test_fact_detail_matches_the_drf_view(voted_thread, settings, no_fallback):
+    client, fact, _ = voted_thread
+    url = reverse("funfacts_test-detail", args=[fact.id])
+
+    result = both_urlconfs(settings, lambda: client.get(url))
+
+    assert result.json()["userReaction"] == "upvote"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("target", ["fact", "comment"])
+def test_put_vote_matches_the_drf_view(voted_thread, settings, no_fallback, target):
+    client, fact, reply = voted_thread
+    if target == "fact":
+        url = reverse("fact_votes", args=[fact.id, "downvote"])
+    else:
+        url = reverse("comment_votes", args=[reply.id, "downvote"])
+
+    result = both_urlconfs(settings, lambda: client.put(url))
+
+    assert result.json() == {
+        "userReaction": "downvote",
+        "countVotes": -1,
+        "upvoteCount": 0,
+        "downvoteCount": 1,
+    }
+
+
+@pytest.mark.django_db
+def test_other_requests_fall_back_to_the_drf_views(voted_thread, settings, monkeypatch):
+    client, fact, _ = voted_thread
+    credentials = base64.b64encode(b"reader:passwd").decode()
+    basic = APIClient()
+    basic.credentials(HTTP_AUTHORIZATION=f"Basic {credentials}")
+    invalid = APIClient()
+    invalid.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+    facts = reverse("funfacts_test-list")
+    comments = reverse("comments_test-list", kwargs={"fact_id": fact.id})
+    detail = reverse("funfacts_test-detail", args=[fact.id])
+    votes = reverse("fact_votes", args=[fact.id, "upvote"])
+    requests = [
+        lambda: APIClient().get(facts),
+        lambda: APIClient().get(detail),
+        lambda: APIClient().get(comments),
+        lambda: basic.get(facts),
+        lambda: invalid.get(comments),
+        lambda: client.get(facts + "?format=api"),
+        lambda: client.get(detail, HTTP_ACCEPT="text/html"),
+        lambda: client.get(reverse("funfacts_test-detail", args=[0])),
+        lambda: client.get(facts + "?cursor=invalid"),
+        lambda: client.put(reverse("fact_votes", args=[fact.id, "sideways"])),
+        lambda: client.put(reverse("fact_votes", args=[0, "upvote"])),
+        lambda: basic.put(votes),
+        lambda: APIClient().put(votes),
+    ]
+    calls = []
+    fallback = AsyncFastPathView.fallback
+
+    async def counted(self, request, *args, **kwargs):
+        calls.append(request.get_full_path())
+        return await fallback(self, request, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncFastPathView, "fallback", counted)
+    for send in requests:
+        settings.ROOT_URLCONF = "MeadowsOfWisdom_api.async_urls"
+        fast = send()
+        settings.ROOT_URLCONF = "MeadowsOfWisdom_api.urls"
+        assert fast.status_code == send().status_code
+    assert len(calls) == len(requests)
+
+    settings.ROOT_URLCONF = "MeadowsOfWisdom_api.async_urls"
+    result = client.post(facts, {"factText": "async"}, format="json")
+    assert result.status_code == 201
+    detail = reverse("funfacts_test-detail", args=[result.json()["id"]])
+    assert client.delete(detail).status_code == 204
+
+
+@pytest.mark.django_db
+def test_fast_paths_and_sign_up_skip_csrf_checks(voted_thread, settings, no_fallback):
+    client, fact, _ = voted_thread
+    client.handler.enforce_csrf_checks = True
+    settings.ROOT_URLCONF = "MeadowsOfWisdom_api.async_urls"
+
+    vote = client.put(reverse("fact_votes", args=[fact.id, "downvote"]))
+    sign_up = client.post(
+        reverse("register_test-list"), {"username": "csrf", "password": "test_password"}
+    )
+
+    assert vote.status_code == 200
+    assert sign_up.status_code == 201
@@ -0,0 +1,198 @@
+import base64
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mow_api import authentication
+from mow_api.models import FunFact
+from mow_api.tests.conftest import fact_votes_url
+from rest_framework.test import APIClient
+
+
+def basic_client(username, password):
+    client = APIClient()
+    credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+    client.credentials(HTTP_AUTHORIZATION=f"Basic {credentials}")
+    return client
+
+
+@pytest.fixture
+def password_checks(monkeypatch):
+    checks = []
+    check_password = User.check_password
+
+    def counted(user, raw_password):
+        checks.append(raw_password)
+        return check_password(user, raw_password)
+
+    monkeypatch.setattr(User, "check_password", counted)
+    return checks
+
+
+def vote(client, fact, vote_value):
+    """
+    Vote and return the response and the number of user queries it made.
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = client.put(fact_votes_url(fact, vote_value))
+    queries = [q for q in context.captured_queries if 'FROM "auth_user"' in q["sql"]]
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+def test_votes_skip_the_user_query_once_cached(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    response, queries = vote(client, fact, "upvote")
+    assert (response.status_code, queries) == (200, 1)
+    response, queries = vote(client, fact, "downvote")
+    assert (response.status_code, queries) == (200, 0)
+
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count) == (0, 1)
+
+
+@pytest.mark.django_db
+def test_password_change_reloads_the_user(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    vote(client, fact, "upvote")
+
+    user.set_password("new password")
+    user.save()
+
+    response, queries = vote(client, fact, "downvote")
+    assert (response.status_code, queries) == (200, 1)
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_rejected_at_once(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    vote(client, fact, "upvote")
+
+    user.is_active = False
+    user.save()
+
+    response, _ = vote(client, fact, "downvote")
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_async_views_share_the_user_cache(api_client, settings):
+    settings.ROOT_URLCONF = "MeadowsOfWisdom_api.async_urls"
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    response, queries = vote(client, fact, "upvote")
+    assert (response.status_code, queries) == (200, 1)
+    settings.ROOT_URLCONF = "MeadowsOfWisdom_api.urls"
+    response, queries = vote(client, fact, "downvote")
+    assert (response.status_code, queries) == (200, 0)
+
+    user.is_active = False
+    user.save()
+    settings.ROOT_URLCONF = "MeadowsOfWisdom_api.async_urls"
+    response, _ = vote(client, fact, "upvote")
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_cached_users_expire(api_client, monkeypatch):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    now = authentication.time.monotonic()
+    vote(client, fact, "upvote")
+
+    ttl = authentication.user_cache.ttl
+    monkeypatch.setattr(authentication.time, "monotonic", lambda: now + ttl + 1)
+    response, queries = vote(client, fact, "downvote")
+    assert (response.status_code, queries) == (200, 1)
+
+
+@pytest.mark.django_db
+def test_cache_can_be_disabled(api_client, monkeypatch):
+    monkeypatch.setattr(authentication.user_cache, "ttl", 0)
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    assert vote(client, fact, "upvote")[1] == 1
+    assert vote(client, fact, "downvote")[1] == 1
+    assert not authentication.user_cache.entries
+
+
+def test_cache_evicts_the_least_recently_used_token():
+    first, second = User(pk=1), User(pk=2)
+    cache = authentication.UserCache(max_size=2, ttl=30)
+    cache.set(("1", "a"), first)
+    cache.set(("1", "b"), first)
+    cache.get(("1", "a"))
+    cache.set(("2", "c"), second)
+
+    assert cache.get(("1", "b")) is None
+    assert cache.get(("1", "a")) is first
+
+    cache.invalidate("1")
+    assert cache.get(("1", "a")) is None
+    assert cache.get(("2", "c")) is second
+
+
+@pytest.mark.django_db
+def test_basic_credentials_are_hashed_once(api_client, password_checks):
+    _, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    client = basic_client("voter", "passwd")
+
+    for vote_value in ("upvote", "downvote", "upvote"):
+        response, queries = vote(client, fact, vote_value)
+        assert response.status_code == 200
+    assert password_checks == ["passwd"]
+    assert queries == 0
+
+
+@pytest.mark.django_db
+def test_wrong_basic_credentials_are_never_cached(api_client, password_checks):
+    _, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    assert vote(basic_client("voter", "passwd"), fact, "upvote")[0].status_code == 200
+
+    for _ in range(2):
+        response, _ = vote(basic_client("voter", "guess"), fact, "upvote")
+        assert response.status_code == 401
+    assert password_checks == ["passwd", "guess", "guess"]
+
+
+@pytest.mark.django_db
+def test_password_change_rejects_cached_basic_credentials(api_client):
+    _, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    client = basic_client("voter", "passwd")
+    vote(client, fact, "upvote")
+
+    user.set_password("new password")
+    user.save()
+
+    assert vote(client, fact, "downvote")[0].status_code == 401
+    response, _ = vote(basic_client("voter", "new password"), fact, "downvote")
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_token_is_issued_for_basic_credentials(api_client):
+    _, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    url = reverse("token_obtain_pair")
+
+    assert basic_client("voter", "guess").post(url).status_code == 401
+    response = basic_client("voter", "passwd").post(url)
+    assert response.status_code == 200
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    assert vote(client, fact, "upvote")[0].status_code == 200
+
+    response = APIClient().post(url, {"username": "voter", "password": "passwd"})
+    assert set(response.data) == {"refresh", "access"}
@@ -0,0 +1,129 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mow_api.models import FunFact
+from mow_api.tests.conftest import add_facts
+from rest_framework.test import APIClient
+
+
+def voter_client():
+    voter = User.objects.create_user(username="cached_voter")
+    client = APIClient()
+    client.force_authenticate(voter)
+    return client
+
+
+@pytest.mark.django_db
+def test_anonymous_list_is_cached(author):
+    add_facts(author, 3)
+    client = APIClient()
+    url = reverse("funfacts_test-list")
+
+    first = client.get(url)
+    second = client.get(url)
+
+    assert first["X-Cache"] == "MISS"
+    assert second["X-Cache"] == "HIT"
+    assert first.data == second.data
+
+
+@pytest.mark.django_db
+def test_authenticated_list_is_not_cached(author):
+    add_facts(author, 1)
+    client = voter_client()
+    url = reverse("funfacts_test-list")
+
+    client.get(url)
+    assert "X-Cache" not in client.get(url)
+
+
+@pytest.mark.django_db
+def test_vote_invalidates_pages_showing_the_fact(
+    author, django_capture_on_commit_callbacks
+):
+    facts = add_facts(author, 4)
+    client = APIClient()
+    url = reverse("funfacts_test-list")
+    shows_fact = url + "?limit=2"
+    other_page = client.get(shows_fact).data["next"]
+    client.get(shows_fact)
+    client.get(other_page)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        voter_client().post(
+            reverse(
+                "fact_votes", kwargs={"fact_id": facts[-1].id, "vote_value": "upvote"}
+            )
+        )
+
+    refreshed = client.get(shows_fact)
+    assert refreshed["X-Cache"] == "MISS"
+    assert refreshed.json()["results"][0]["countVotes"] == 1
+    assert client.get(other_page)["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_new_fact_invalidates_listing(author, django_capture_on_commit_callbacks):
+    add_facts(author, 1)
+    client = APIClient()
+    url = reverse("funfacts_test-list")
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        FunFact.objects.create(author=author, fact_text="brand new")
+
+    response = client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["results"][0]["factText"] == "brand new"
+
+
+@pytest.mark.django_db
+def test_detail_is_cached_until_edited(author, django_capture_on_commit_callbacks):
+    (fact,) = add_facts(author, 1)
+    client = APIClient()
+    url = reverse("funfacts_test-detail", kwargs={"pk": fact.id})
+
+    assert client.get(url)["X-Cache"] == "MISS"
+    assert client.get(url)["X-Cache"] == "HIT"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        fact.fact_text = "edited"
+        fact.save()
+
+    response = client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert response.data["factText"] == "edited"
+
+
+@pytest.mark.django_db
+def test_cache_stats(author):
+    add_facts(author, 1)
+    admin = User.objects.create_superuser(username="cache_admin", password="passwd")
+    client = APIClient()
+    url = reverse("funfacts_test-list")
+    client.get(url)
+    client.get(url)
+
+    client.force_authenticate(admin)
+    stats = client.get(reverse("cache_stats")).data
+
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_anonymous_cache_hit_answers_conditional_requests_without_queries(author):
+    add_facts(author, 3)
+    client = APIClient()
+    url = reverse("funfacts_test-list")
+    etag = client.get(url)["ETag"]
+
+    with CaptureQueriesContext(connection) as context:
+        hit = client.get(url)
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert (hit.status_code, hit["X-Cache"], hit["ETag"]) == (200, "HIT", etag)
+    assert (not_modified.status_code, not_modified["X-Cache"]) == (304, "HIT")
+    assert not_modified["ETag"] == etag
+    assert not context.captured_queries
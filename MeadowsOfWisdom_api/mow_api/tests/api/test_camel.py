@@ -0,0 +1,47 @@
+import pytest
+from django.urls import reverse
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from djangorestframework_camel_case.util import camelize
+from mow_api.camel import CamelCaseOutputMixin, camel_key
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+from mow_api.serializers import FunFactCommentSerializer, FunFactSerializer
+from rest_framework.renderers import JSONRenderer
+
+
+@pytest.mark.parametrize(
+    "name", ["id", "user_id", "more_replies", "count_2_votes", "_private", "a__b"]
+)
+def test_camel_key_follows_the_library(name):
+    assert camel_key(name) == next(iter(camelize({name: None})))
+
+
+@pytest.mark.django_db
+def test_serializers_render_like_the_camel_case_renderer(api_client):
+    client, user = api_client("camel")
+    fact = FunFact.objects.create(author=user, fact_text="ünïcödé fact")
+    comment = FunFactComment.objects.create(
+        author=user, fact=fact, comment_text="test comment"
+    )
+    FunFactVote.objects.put_vote(user, FunFact, fact.id, "upvote")
+    request = client.get(reverse("funfacts_test-list")).wsgi_request
+    request.user = user
+
+    for serializer in (
+        FunFactSerializer(fact, context={"request": request}),
+        FunFactCommentSerializer(comment, context={"request": request}),
+    ):
+        snake = super(CamelCaseOutputMixin, serializer).to_representation(
+            serializer.instance
+        )
+        assert JSONRenderer().render(serializer.data) == (
+            CamelCaseJSONRenderer().render(snake)
+        )
+
+
+@pytest.mark.django_db
+def test_error_responses_are_camelized(api_client):
+    client, _ = api_client("camel")
+    response = client.post(reverse("funfacts_test-list"), {}, format="json")
+
+    assert response.status_code == 400
+    assert list(response.json()) == ["factText"]
@@ -0,0 +1,109 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mow_api.models import FunFact, FunFactComment
+from rest_framework.test import APIClient
+
+
+def setup_facts():
+    author = User.objects.create_user(username="polled_author")
+    fact = FunFact.objects.create(author=author, fact_text="test fact")
+    client = APIClient()
+    client.force_authenticate(author)
+    return client, author, fact
+
+
+@pytest.mark.django_db
+def test_unchanged_list_is_not_modified():
+    client, _, _ = setup_facts()
+    url = reverse("funfacts_test-list")
+    etag = client.get(url)["ETag"]
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert not any("auth_user" in query["sql"] for query in context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_vote_changes_list_etag(django_capture_on_commit_callbacks):
+    client, _, fact = setup_facts()
+    url = reverse("funfacts_test-list")
+    etag = client.get(url)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(
+            reverse("fact_votes", kwargs={"fact_id": fact.id, "vote_value": "upvote"})
+        )
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_etag_depends_on_viewer():
+    client, _, _ = setup_facts()
+    url = reverse("funfacts_test-list")
+
+    response = APIClient().get(url)
+    assert client.get(url)["ETag"] != response["ETag"]
+    assert "Authorization" in response["Vary"]
+
+
+@pytest.mark.django_db
+def test_comment_list_etag_follows_comment_votes(django_capture_on_commit_callbacks):
+    client, author, fact = setup_facts()
+    comment = FunFactComment.objects.create(
+        author=author, fact=fact, comment_text="test comment"
+    )
+    url = reverse("comments_test-list", kwargs={"fact_id": fact.id})
+    etag = client.get(url)["ETag"]
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(
+            reverse(
+                "comment_votes",
+                kwargs={"comment_id": comment.id, "vote_value": "downvote"},
+            )
+        )
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_comment_list_etag_follows_deleted_replies(django_capture_on_commit_callbacks):
+    client, author, fact = setup_facts()
+    parent = FunFactComment.objects.create(
+        author=author, fact=fact, comment_text="parent"
+    )
+    reply = FunFactComment.objects.create(
+        author=author, fact=fact, parent=parent, comment_text="reply"
+    )
+    FunFactComment.objects.create(author=author, fact=fact, comment_text="later")
+    # The first page shows the parent and has a next page either way.
+    url = reverse("comments_test-list", kwargs={"fact_id": fact.id}) + "?limit=1"
+    etag = client.get(url)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reply.delete()
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["replyCount"] == 0
+
+
+@pytest.mark.django_db
+def test_if_modified_since():
+    client, _, _ = setup_facts()
+    url = reverse("funfacts_test-list")
+    last_modified = client.get(url)["Last-Modified"]
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
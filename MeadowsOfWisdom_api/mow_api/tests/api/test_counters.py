@@ -0,0 +1,115 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+from rest_framework.test import APIClient
+
+
+def setup_thread():
+    author = User.objects.create_user(username="counted_author")
+    fact = FunFact.objects.create(author=author, fact_text="test fact")
+    client = APIClient()
+    client.force_authenticate(author)
+    return client, author, fact
+
+
+def post_comment(client, fact, text, parent=None):
+    url = reverse("comments_test-list", kwargs={"fact_id": fact.id})
+    payload = dict(comment_text=text, parent_id=parent.id if parent else 0)
+    response = client.post(url, payload)
+    assert response.status_code == 201
+    return FunFactComment.objects.get(pk=response.data["id"])
+
+
+@pytest.mark.django_db
+def test_counters_follow_created_comments():
+    client, _, fact = setup_thread()
+
+    first = post_comment(client, fact, "first")
+    post_comment(client, fact, "reply", first)
+    post_comment(client, fact, "another reply", first)
+
+    fact.refresh_from_db()
+    first.refresh_from_db()
+    assert fact.comment_count == 3
+    assert first.reply_count == 2
+
+    response = client.get(reverse("funfacts_test-detail", kwargs={"pk": fact.id}))
+    assert response.data["commentCount"] == 3
+
+
+@pytest.mark.django_db
+def test_counters_follow_deleted_subtrees():
+    client, _, fact = setup_thread()
+    first = post_comment(client, fact, "first")
+    reply = post_comment(client, fact, "reply", first)
+    post_comment(client, fact, "nested", reply)
+    post_comment(client, fact, "second")
+
+    client.delete(
+        reverse("comments_test-detail", kwargs={"fact_id": fact.id, "pk": reply.id})
+    )
+
+    fact.refresh_from_db()
+    first.refresh_from_db()
+    assert fact.comment_count == 2
+    assert first.reply_count == 0
+
+
+@pytest.mark.django_db
+def test_counters_follow_cascading_user_delete():
+    client, _, fact = setup_thread()
+    first = post_comment(client, fact, "first")
+    replier = User.objects.create_user(username="replier")
+    FunFactComment.objects.create(
+        author=replier, fact=fact, parent=first, comment_text="reply"
+    )
+
+    replier.delete()
+
+    fact.refresh_from_db()
+    first.refresh_from_db()
+    assert fact.comment_count == 1
+    assert first.reply_count == 0
+
+
+@pytest.mark.django_db
+def test_recount_comments_repairs_drift():
+    client, _, fact = setup_thread()
+    first = post_comment(client, fact, "first")
+    post_comment(client, fact, "reply", first)
+    FunFact.objects.update(comment_count=40)
+    FunFactComment.objects.update(reply_count=7)
+
+    call_command("recount_comments", stdout=StringIO())
+
+    fact.refresh_from_db()
+    first.refresh_from_db()
+    assert fact.comment_count == 2
+    assert first.reply_count == 1
+
+
+@pytest.mark.django_db
+def test_edits_keep_concurrent_counter_updates():
+    client, author, fact = setup_thread()
+    comment = post_comment(client, fact, "first")
+    stale_fact = FunFact.objects.get(pk=fact.pk)
+    stale_comment = FunFactComment.objects.get(pk=comment.pk)
+
+    post_comment(client, fact, "reply", comment)
+    FunFactVote.objects.put_vote(author, FunFact, fact.id, "upvote")
+    FunFactVote.objects.put_vote(author, FunFactComment, comment.id, "downvote")
+    stale_fact.fact_text = "edited fact"
+    stale_fact.save()
+    stale_comment.comment_text = "edited comment"
+    stale_comment.save()
+
+    fact.refresh_from_db()
+    comment.refresh_from_db()
+    assert (fact.fact_text, fact.upvote_count, fact.score) == ("edited fact", 1, 1)
+    assert fact.comment_count == 2
+    assert (comment.comment_text, comment.downvote_count) == ("edited comment", 1)
+    assert (comment.score, comment.reply_count) == (-1, 1)
@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.test import AsyncClient
+from django.urls import reverse
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+from mow_api.tests.conftest import add_facts
+from mow_api.views import ExportView
+from rest_framework.test import APIClient
+
+
+def export_url(dataset, **params):
+    url = reverse("export", kwargs={"dataset": dataset})
+    if params:
+        url += "?" + "&".join(f"{key}={value}" for key, value in params.items())
+    return url
+
+
+def read_ndjson(response):
+    assert response.streaming
+    content = b"".join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db
+def test_export_is_for_admins(api_client):
+    client, user = api_client("analyst")
+    add_facts(user, 1)
+
+    assert APIClient().get(export_url("facts")).status_code == 401
+    assert client.get(export_url("facts")).status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_streams_asynchronously_under_asgi(api_client, monkeypatch):
+    client, user = api_client("admin", is_staff=True)
+    add_facts(user, 5)
+    monkeypatch.setattr(ExportView, "chunk_size", 2)
+    expected = client.get(export_url("facts", format="csv")).getvalue()
+
+    @async_to_sync
+    async def get():
+        headers = {"Authorization": client._credentials["HTTP_AUTHORIZATION"]}
+        response = await AsyncClient().get(
+            export_url("facts", format="csv"), headers=headers
+        )
+        assert response.is_async
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    assert get() == expected
+
+
+@pytest.mark.django_db
+def test_export_streams_facts_as_ndjson(api_client):
+    client, user = api_client("admin", is_staff=True)
+    facts = add_facts(user, 3)
+    FunFactVote.objects.put_vote(user, FunFact, facts[1].id, "upvote")
+    FunFact.objects.filter(pk=facts[2].pk).update(sharded_counters=True)
+    FunFactVote.objects.put_vote(user, FunFact, facts[2].id, "downvote")
+
+    response = client.get(export_url("facts"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    rows = read_ndjson(response)
+    assert [row["id"] for row in rows] == [fact.id for fact in facts]
+    assert [row["countVotes"] for row in rows] == [0, 1, -1]
+    assert rows[0]["factText"] == "fact 0"
+    assert rows[0]["userId"] == user.id
+    assert rows[0]["createdAt"].endswith("Z")
+
+
+@pytest.mark.django_db
+def test_export_resumes_after_an_id(api_client):
+    client, user = api_client("admin", is_staff=True)
+    facts = add_facts(user, 5)
+
+    response = client.get(export_url("facts", since=facts[1].id))
+
+    assert [row["id"] for row in read_ndjson(response)] == [
+        fact.id for fact in facts[2:]
+    ]
+
+
+@pytest.mark.django_db
+def test_export_since_a_timestamp_orders_by_update(api_client):
+    client, user = api_client("admin", is_staff=True)
+    facts = add_facts(user, 3)
+    since = FunFact.objects.get(pk=facts[2].pk).updated_at
+    facts[0].fact_text = "edited"
+    facts[0].save()
+
+    response = client.get(
+        export_url("facts", since=since.isoformat().replace("+", "%2B"))
+    )
+
+    assert [row["id"] for row in read_ndjson(response)] == [facts[2].id, facts[0].id]
+
+
+@pytest.mark.django_db
+def test_export_rejects_invalid_since(api_client):
+    client, _ = api_client("admin", is_staff=True)
+
+    response = client.get(export_url("facts", since="yesterday"))
+    assert response.status_code == 400
+    assert "since" in json.loads(response.content)
+
+    now = "2023-09-01T00:00:00Z"
+    assert client.get(export_url("votes", since=now)).status_code == 400
+    assert client.get(export_url("users")).status_code == 404
+
+
+@pytest.mark.django_db
+def test_export_streams_comments_and_votes_as_csv(api_client):
+    client, user = api_client("admin", is_staff=True)
+    fact = add_facts(user, 1)[0]
+    root = FunFactComment.objects.create(author=user, fact=fact, comment_text="a")
+    reply = FunFactComment.objects.create(
+        author=user, fact=fact, parent=root, comment_text='quote " and, comma'
+    )
+    FunFactVote.objects.put_vote(user, FunFactComment, reply.id, "upvote")
+    FunFactVote.objects.put_vote(user, FunFact, fact.id, "downvote")
+
+    response = client.get(export_url("comments", format="csv"))
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    content = b"".join(response.streaming_content).decode()
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [row["commentText"] for row in rows] == ["a", 'quote " and, comma']
+    assert [row["parentId"] for row in rows] == ["", str(root.id)]
+    assert rows[1]["countVotes"] == "1"
+
+    response = client.get(export_url("votes"), HTTP_ACCEPT="text/csv")
+    content = b"".join(response.streaming_content).decode()
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [(row["target"], row["objectId"], row["vote"]) for row in rows] == [
+        ("comment", str(reply.id), "upvote"),
+        ("fact", str(fact.id), "downvote"),
+    ]
+
+
+@pytest.mark.django_db
+def test_export_command_writes_in_chunks(api_client, tmp_path):
+    _, user = api_client("exporter")
+    facts = add_facts(user, 5)
+    output = tmp_path / "facts.ndjson"
+
+    call_command("export_meadows", "facts", "--chunk-size=2", f"--output={output}")
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["id"] for row in rows] == [fact.id for fact in facts]
+
+    out = StringIO()
+    call_command(
+        "export_meadows", "facts", "--format=csv", f"--since={facts[3].id}", stdout=out
+    )
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert [row["id"] for row in rows] == [str(facts[4].id)]
+
+    with pytest.raises(CommandError):
+        call_command("export_meadows", "votes", "--since=2023-09-01")
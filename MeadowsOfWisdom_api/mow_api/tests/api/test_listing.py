@@ -0,0 +1,93 @@
+from itertools import count as sequence
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+from mow_api.serializers import FunFactSerializer
+from rest_framework.test import APIClient
+
+
+usernames = (f"author_{i}" for i in sequence())
+
+
+def add_voted_facts(user, count):
+    for i in range(count):
+        author = User.objects.create_user(username=next(usernames))
+        fact = FunFact.objects.create(author=author, fact_text=f"fact {i}")
+        FunFactVote.objects.create(author=user, tagged_object=fact, vote="upvote")
+
+
+def add_comments(user, fact, count):
+    parent = None
+    for i in range(count):
+        author = User.objects.create_user(username=next(usernames))
+        parent = FunFactComment.objects.create(
+            author=author, fact=fact, parent=parent, comment_text=f"comment {i}"
+        )
+        FunFactVote.objects.create(author=user, tagged_object=parent, vote="downvote")
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries), response
+
+
+@pytest.mark.django_db
+def test_funfact_list_query_count_is_constant(api_client):
+    client, user = api_client("reader")
+    url = reverse("funfacts_test-list")
+
+    add_voted_facts(user, 2)
+    client.get(url)  # Caches the authenticated user.
+    small_page, _ = count_queries(client, url)
+    add_voted_facts(user, 20)
+    large_page, response = count_queries(client, url)
+
+    assert small_page == large_page
+    assert {fact["userReaction"] for fact in response.json()["results"]} == {"upvote"}
+
+
+@pytest.mark.django_db
+def test_comment_list_query_count_is_constant(api_client):
+    client, user = api_client("reader")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    url = reverse("comments_test-list", kwargs={"fact_id": fact.id})
+
+    add_comments(user, fact, 2)
+    client.get(url)  # Caches the authenticated user.
+    small_page, _ = count_queries(client, url)
+    add_comments(user, fact, 20)
+    large_page, response = count_queries(client, url)
+
+    assert small_page == large_page
+    reactions = {comment["userReaction"] for comment in response.json()["results"]}
+    assert reactions == {"downvote"}
+
+
+@pytest.mark.django_db
+def test_anonymous_funfact_list_has_no_reaction(api_client):
+    _, user = api_client("reader")
+    add_voted_facts(user, 3)
+
+    response = APIClient().get(reverse("funfacts_test-list"))
+    assert [fact["userReaction"] for fact in response.json()["results"]] == [None] * 3
+
+
+@pytest.mark.django_db
+def test_reactions_are_batched_for_plain_querysets(api_client):
+    client, user = api_client("reader")
+    add_voted_facts(user, 5)
+    request = client.get(reverse("funfacts_test-list")).wsgi_request
+    request.user = user
+    facts = list(FunFact.objects.select_related("author"))
+
+    with CaptureQueriesContext(connection) as context:
+        data = FunFactSerializer(facts, many=True, context={"request": request}).data
+
+    assert len(context.captured_queries) == 1
+    assert {fact["userReaction"] for fact in data} == {"upvote"}
@@ -0,0 +1,141 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mow_api.models import FunFact, FunFactComment, HotScore, hot_score
+from mow_api.tests.conftest import add_facts
+from rest_framework.test import APIClient
+
+
+def rank(facts):
+    """
+    Score ``facts`` 0, 1, 2, 0, ... in order, so the top ordering has ties.
+    """
+    for i, fact in enumerate(facts):
+        fact.score = i % 3
+    FunFact.objects.bulk_update(facts, ["score"])
+    return facts
+
+
+def walk(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.data)
+        url = response.data["next"]
+    return pages
+
+
+@pytest.mark.django_db
+def test_funfact_pages_cover_every_fact_once(author):
+    facts = rank(add_facts(author, 7))
+    client = APIClient()
+
+    pages = walk(client, reverse("funfacts_test-list") + "?limit=3")
+    ids = [fact["id"] for page in pages for fact in page["results"]]
+
+    assert [len(page["results"]) for page in pages] == [3, 3, 1]
+    assert ids == [fact.id for fact in reversed(facts)]
+    assert pages[0]["previous"] is None
+
+
+@pytest.mark.django_db
+def test_funfact_top_ordering_breaks_ties_by_id(author):
+    facts = rank(add_facts(author, 7))
+    client = APIClient()
+
+    pages = walk(client, reverse("funfacts_test-list") + "?limit=2&ordering=top")
+    ids = [fact["id"] for page in pages for fact in page["results"]]
+
+    expected = sorted(facts, key=lambda fact: (fact.score, fact.id), reverse=True)
+    assert ids == [fact.id for fact in expected]
+
+
+@pytest.mark.django_db
+def test_funfact_hot_ordering_weighs_score_against_age(author):
+    facts = rank(add_facts(author, 7))
+    for age, fact in enumerate(facts):
+        FunFact.objects.filter(pk=fact.pk).update(
+            created_at=timezone.now() - timedelta(hours=age * 3)
+        )
+    FunFact.objects.update(hot_score=HotScore("score"))
+    client = APIClient()
+
+    pages = walk(client, reverse("funfacts_test-list") + "?limit=2&ordering=hot")
+    ids = [fact["id"] for page in pages for fact in page["results"]]
+
+    expected = sorted(
+        FunFact.objects.all(),
+        key=lambda fact: (hot_score(fact.score, fact.created_at), fact.id),
+        reverse=True,
+    )
+    assert ids == [fact.id for fact in expected]
+
+
+@pytest.mark.django_db
+def test_previous_link_returns_preceding_page(author):
+    add_facts(author, 5)
+    client = APIClient()
+
+    first = client.get(reverse("funfacts_test-list") + "?limit=2").data
+    second = client.get(first["next"]).data
+    back = client.get(second["previous"]).data
+
+    assert [fact["id"] for fact in back["results"]] == [
+        fact["id"] for fact in first["results"]
+    ]
+
+
+@pytest.mark.django_db
+def test_comment_pages_are_chronological():
+    author = User.objects.create_user(username="paged_author")
+    fact = FunFact.objects.create(author=author, fact_text="test fact")
+    comments = [
+        FunFactComment.objects.create(author=author, fact=fact, comment_text=str(i))
+        for i in range(5)
+    ]
+    client = APIClient()
+    client.force_authenticate(author)
+
+    url = reverse("comments_test-list", kwargs={"fact_id": fact.id}) + "?limit=2"
+    pages = walk(client, url)
+    ids = [comment["id"] for page in pages for comment in page["results"]]
+
+    assert ids == [comment.id for comment in comments]
+
+
+@pytest.mark.django_db
+def test_pagination_runs_no_count_query(author):
+    add_facts(author, 5)
+    client = APIClient()
+
+    with CaptureQueriesContext(connection) as context:
+        client.get(reverse("funfacts_test-list") + "?limit=2")
+
+    assert not any("COUNT(" in query["sql"] for query in context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_invalid_cursor():
+    client = APIClient()
+    response = client.get(reverse("funfacts_test-list") + "?cursor=garbage")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "position", [[None, None], [[1], 2], [{"score": 1}, 2], ["top", "1"]]
+)
+def test_cursor_with_invalid_position(author, position):
+    add_facts(author, 2)
+    cursor = json.dumps({"p": position, "r": 0}).encode()
+    url = reverse("funfacts_test-list") + "?ordering=top&cursor="
+    response = APIClient().get(url + urlsafe_b64encode(cursor).decode())
+    assert response.status_code == 404
@@ -0,0 +1,47 @@
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from mow_api.views import CommentsViewSet, FunFactViewSet
+from rest_framework.test import APIClient
+
+
+def both_paths(client, view, url):
+    fast = client.get(url)
+    with mock.patch.object(view, "list_reader", None):
+        slow = client.get(url)
+    assert fast.status_code == slow.status_code == 200
+    return fast, slow
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["", "?ordering=top&limit=2", "?ordering=hot"])
+def test_fact_list_reader_matches_serializer_output(voted_thread, query):
+    client, _, _ = voted_thread
+    url = reverse("funfacts_test-list") + query
+
+    for user_client in (client, APIClient()):
+        fast, slow = both_paths(user_client, FunFactViewSet, url)
+        assert fast.content == slow.content
+
+
+@pytest.mark.django_db
+def test_fact_list_reader_cursors_match_serializer_cursors(voted_thread):
+    client, _, _ = voted_thread
+    url = reverse("funfacts_test-list") + "?ordering=top&limit=1"
+
+    while url:
+        fast, slow = both_paths(client, FunFactViewSet, url)
+        assert fast.content == slow.content
+        url = fast.json()["next"]
+
+
+@pytest.mark.django_db
+def test_comment_list_reader_matches_serializer_output(voted_thread):
+    client, fact, _ = voted_thread
+    url = reverse("comments_test-list", kwargs={"fact_id": fact.id})
+
+    fast, slow = both_paths(client, CommentsViewSet, url)
+
+    assert fast.content == slow.content
+    assert [comment["depth"] for comment in fast.json()["results"]] == [0, 1]
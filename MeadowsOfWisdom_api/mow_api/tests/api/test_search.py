@@ -0,0 +1,102 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.urls import reverse
+from mow_api.models import FunFact, FunFactComment
+from rest_framework.test import APIClient
+
+
+def search_url(query, **params):
+    url = reverse("search") + f"?q={query}"
+    for name, value in params.items():
+        url += f"&{name}={value}"
+    return url
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_highlights_facts():
+    author = User.objects.create_user(username="search_author")
+    often = FunFact.objects.create(
+        author=author, fact_text="Octopuses have three hearts. Octopus ink is dark."
+    )
+    once = FunFact.objects.create(author=author, fact_text="An octopus can taste.")
+    FunFact.objects.create(author=author, fact_text="Honey never spoils.")
+
+    response = APIClient().get(search_url("octopus"))
+
+    assert response.status_code == 200
+    results = response.data["results"]
+    assert [result["id"] for result in results] == [often.id, once.id]
+    assert results[1]["headline"] == "An <mark>octopus</mark> can taste."
+    assert results[1]["factId"] == once.id
+
+
+@pytest.mark.django_db
+def test_search_headline_escapes_text():
+    author = User.objects.create_user(username="search_author")
+    FunFact.objects.create(author=author, fact_text="otters > beavers & friends")
+
+    result = APIClient().get(search_url("otters")).data["results"][0]
+
+    assert result["headline"] == "<mark>otters</mark> &gt; beavers &amp; friends"
+
+
+@pytest.mark.django_db
+def test_search_pages_cover_every_match_once():
+    author = User.objects.create_user(username="search_author")
+    facts = [
+        FunFact.objects.create(author=author, fact_text="bees " * (i % 3 + 1))
+        for i in range(7)
+    ]
+    client = APIClient()
+
+    ids, url = [], search_url("bees", limit=3)
+    while url:
+        page = client.get(url).data
+        ids += [result["id"] for result in page["results"]]
+        url = page["next"]
+
+    assert sorted(ids) == sorted(fact.id for fact in facts)
+    assert len(ids) == len(facts)
+
+
+@pytest.mark.django_db
+def test_search_vector_follows_edits():
+    author = User.objects.create_user(username="search_author")
+    fact = FunFact.objects.create(author=author, fact_text="Sloths swim well.")
+    fact.fact_text = "Penguins propose with pebbles."
+    fact.save()
+
+    client = APIClient()
+    assert client.get(search_url("sloths")).data["results"] == []
+    assert client.get(search_url("pebbles")).data["results"][0]["id"] == fact.id
+
+
+@pytest.mark.django_db
+def test_comment_search_requires_authentication(api_client):
+    client, user = api_client("searcher")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    comment = FunFactComment.objects.create(
+        author=user, fact=fact, comment_text="Wombats make cube shaped droppings."
+    )
+
+    assert APIClient().get(search_url("wombats", type="comments")).status_code == 401
+    result = client.get(search_url("wombats", type="comments")).data["results"][0]
+    assert (result["id"], result["factId"]) == (comment.id, fact.id)
+
+
+@pytest.mark.django_db
+def test_search_requires_a_query():
+    assert APIClient().get(reverse("search")).status_code == 400
+
+
+@pytest.mark.django_db
+def test_search_uses_the_gin_index():
+    author = User.objects.create_user(username="search_author")
+    FunFact.objects.create(author=author, fact_text="Koalas sleep a lot.")
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    plan = FunFact.objects.search("koalas").explain()
+
+    assert "funfact_search_idx" in plan
@@ -0,0 +1,127 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from mow_api.models import FunFact, FunFactComment, VoteCounterShard, hot_score
+from mow_api.tests.conftest import fact_votes_url
+
+
+@pytest.mark.django_db
+@override_settings(VOTE_SHARD_PROMOTION_RATE=2, VOTE_COUNTER_SHARDS=4)
+def test_hot_fact_is_promoted_and_counted_through_shards(api_client):
+    clients = [api_client(f"hot_voter_{i}") for i in range(5)]
+    fact = FunFact.objects.create(author=clients[0][1], fact_text="test fact")
+
+    for client, _ in clients[:4]:
+        assert client.post(fact_votes_url(fact, "upvote")).status_code == 200
+    response = clients[4][0].put(fact_votes_url(fact, "downvote"))
+
+    fact.refresh_from_db()
+    assert fact.sharded_counters
+    assert (fact.upvote_count, fact.downvote_count) == (2, 0)
+    assert VoteCounterShard.objects.filter(object_id=fact.id).exists()
+    assert (response.data["upvoteCount"], response.data["downvoteCount"]) == (4, 1)
+    assert response.data["countVotes"] == 3
+
+    data = clients[0][0].get(reverse("funfacts_test-detail", args=[fact.id])).data
+    assert (data["upvoteCount"], data["downvoteCount"], data["countVotes"]) == (
+        4,
+        1,
+        3,
+    )
+
+
+@pytest.mark.django_db
+@override_settings(VOTE_COUNTER_SHARDS=4)
+def test_sharded_counters_follow_every_write_path(api_client):
+    client, user = api_client("sharded_voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    comment = FunFactComment.objects.create(
+        author=user, fact=fact, comment_text="test comment"
+    )
+    FunFact.objects.update(sharded_counters=True)
+    FunFactComment.objects.update(sharded_counters=True)
+
+    client.post(fact_votes_url(fact, "upvote"))
+    client.patch(fact_votes_url(fact, "downvote"))
+    client.post(
+        reverse("batch_votes"),
+        {"votes": [{"target": "comment", "id": comment.id, "vote": "upvote"}]},
+        format="json",
+    )
+
+    fact = FunFact.objects.with_sharded_counters().get()
+    comment = FunFactComment.objects.with_sharded_counters().get()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (0, 1, -1)
+    assert (comment.upvote_count, comment.downvote_count, comment.score) == (1, 0, 1)
+
+    client.delete(fact_votes_url(fact, "downvote"))
+    fact = FunFact.objects.with_sharded_counters().get()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_editing_a_sharded_fact_keeps_its_counters(api_client):
+    client, user = api_client("sharded_author")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    stale = FunFact.objects.get(pk=fact.pk)
+    FunFact.objects.filter(pk=fact.pk).update(sharded_counters=True)
+    client.put(fact_votes_url(fact, "upvote"))
+    stale.save()
+
+    url = reverse("funfacts_test-detail", args=[fact.id])
+    response = client.patch(url, {"factText": "edited fact"}, format="json")
+    assert response.status_code == 200
+
+    data = client.get(url).data
+    assert (data["factText"], data["upvoteCount"], data["countVotes"]) == (
+        "edited fact",
+        1,
+        1,
+    )
+    fact.refresh_from_db()
+    assert fact.sharded_counters
+    assert (fact.upvote_count, fact.score) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_recount_folds_shards_into_the_row(api_client):
+    client, user = api_client("recounted_voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    FunFact.objects.update(sharded_counters=True)
+    client.put(fact_votes_url(fact, "upvote"))
+
+    call_command("recount_votes", stdout=StringIO())
+
+    assert not VoteCounterShard.objects.exists()
+    fact = FunFact.objects.with_sharded_counters().get()
+    assert (fact.upvote_count, fact.score) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_refresh_rankings_folds_shards_into_the_row(api_client):
+    client, user = api_client("folded_voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    FunFact.objects.update(sharded_counters=True)
+    client.put(fact_votes_url(fact, "upvote"))
+
+    call_command("refresh_rankings", stdout=StringIO())
+
+    assert not VoteCounterShard.objects.exists()
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.score) == (1, 1)
+    assert fact.hot_score == pytest.approx(hot_score(1, fact.created_at))
+
+
+@pytest.mark.django_db
+def test_deleting_a_fact_drops_its_shards(api_client):
+    client, user = api_client("deleting_voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    FunFact.objects.update(sharded_counters=True)
+    client.put(fact_votes_url(fact, "upvote"))
+
+    fact.delete()
+
+    assert not VoteCounterShard.objects.exists()
@@ -0,0 +1,173 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mow_api.models import FunFact, FunFactComment
+from rest_framework.test import APIClient
+
+
+def thread():
+    """
+    first
+    ├── reply 0
+    │   └── nested
+    ├── reply 1
+    └── reply 2
+    second
+    """
+    author = User.objects.create_user(username="thread_author")
+    fact = FunFact.objects.create(author=author, fact_text="test fact")
+
+    def comment(text, parent=None):
+        return FunFactComment.objects.create(
+            author=author, fact=fact, parent=parent, comment_text=text
+        )
+
+    first = comment("first")
+    replies = [comment(f"reply {i}", first) for i in range(3)]
+    comment("nested", replies[0])
+    comment("second")
+
+    client = APIClient()
+    client.force_authenticate(author)
+    url = reverse("comments_test-tree", kwargs={"fact_id": fact.id})
+    return client, url, first
+
+
+def texts(nodes):
+    return [node["commentText"] for node in nodes]
+
+
+@pytest.mark.django_db
+def test_tree_nests_replies():
+    client, url, _ = thread()
+
+    data = client.get(url).data
+    first = data["results"][0]
+
+    assert texts(data["results"]) == ["first", "second"]
+    assert texts(first["replies"]) == ["reply 0", "reply 1", "reply 2"]
+    assert texts(first["replies"][0]["replies"]) == ["nested"]
+    assert data["moreReplies"] is None
+
+
+@pytest.mark.django_db
+def test_tree_is_one_query_for_comments():
+    client, url, _ = thread()
+
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+
+    comment_queries = [
+        query
+        for query in context.captured_queries
+        if "mow_api_funfactcomment" in query["sql"]
+    ]
+    assert len(comment_queries) == 1
+
+
+@pytest.mark.django_db
+def test_tree_depth_limit_links_to_hidden_replies():
+    client, url, _ = thread()
+
+    data = client.get(url, {"depth": 2}).data
+    reply = data["results"][0]["replies"][0]
+
+    assert reply["replies"] == []
+    assert reply["moreReplies"]["count"] == 1
+    more = client.get(reply["moreReplies"]["next"]).data
+    assert texts(more["results"]) == ["nested"]
+
+
+@pytest.mark.django_db
+def test_tree_reply_cap_resumes_after_last_shown():
+    client, url, first = thread()
+
+    data = client.get(url, {"replies": 1}).data
+    more_replies = data["results"][0]["moreReplies"]
+
+    assert texts(data["results"][0]["replies"]) == ["reply 0"]
+    assert more_replies["count"] == 2
+    assert data["moreReplies"]["count"] == 1
+
+    more = client.get(more_replies["next"]).data
+    assert texts(more["results"]) == ["reply 1"]
+    rest = client.get(more["moreReplies"]["next"]).data
+    assert texts(rest["results"]) == ["reply 2"]
+    assert rest["moreReplies"] is None
+
+
+@pytest.mark.django_db
+def test_tree_unknown_parent():
+    client, url, _ = thread()
+    response = client.get(url, {"parent": 999999})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_paths_are_maintained_on_create():
+    _, _, first = thread()
+    reply = first.replies.order_by("id").first()
+    nested = reply.replies.get()
+
+    assert (first.depth, reply.depth, nested.depth) == (0, 1, 2)
+    assert list(nested.get_ancestors()) == [first, reply]
+    assert set(first.get_descendants()) == set(first.replies.all()) | {nested}
+
+
+@pytest.mark.django_db
+def test_replies_stay_on_their_parents_fact():
+    client, _, first = thread()
+    other = FunFact.objects.create(author=first.author, fact_text="other fact")
+    url = reverse("comments_test-list", kwargs={"fact_id": other.id})
+
+    response = client.post(url, {"comment_text": "stray", "parent_id": first.id})
+
+    assert response.status_code == 404
+    assert not other.comments.exists()
+
+
+@pytest.mark.django_db
+def test_backfill_comment_paths():
+    _, _, first = thread()
+    expected = dict(FunFactComment.objects.values_list("id", "path"))
+    FunFactComment.objects.update(path="", depth=0)
+
+    call_command("backfill_comment_paths", stdout=StringIO())
+
+    assert dict(FunFactComment.objects.values_list("id", "path")) == expected
+    assert FunFactComment.objects.get(comment_text="nested").depth == 2
+
+
+@pytest.mark.django_db
+def test_ancestors_endpoint():
+    client, url, first = thread()
+    nested = FunFactComment.objects.get(comment_text="nested")
+
+    response = client.get(
+        reverse(
+            "comments_test-ancestors",
+            kwargs={"fact_id": nested.fact_id, "pk": nested.pk},
+        )
+    )
+
+    assert texts(response.data) == ["first", "reply 0"]
+
+
+@pytest.mark.django_db
+def test_deleting_comment_removes_subtree():
+    client, url, first = thread()
+
+    client.delete(
+        reverse(
+            "comments_test-detail", kwargs={"fact_id": first.fact_id, "pk": first.pk}
+        )
+    )
+
+    assert list(FunFactComment.objects.values_list("comment_text", flat=True)) == [
+        "second"
+    ]
@@ -1,22 +1,15 @@
 import pytest
 from rest_framework.test import APIClient
+from django.contrib.auth.hashers import identify_hasher
 from django.contrib.auth.models import User
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.test import override_settings
+from mow_api import registration
 from django.urls import reverse
 
 
-def api_client():
-    user = User.objects.create_user(username="test_user", password="passwd")
-    client = APIClient()
-    refresh = RefreshToken.for_user(user)
-    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
-
-    return client
-
-
 @pytest.mark.django_db
-def test_register_user():
-    client = api_client()
+def test_register_user(api_client):
+    client, _ = api_client("test_user")
     payload = dict(username="test_user2", password="test_password")
     url = reverse("register_test-list")
     response = client.post(url, payload)
@@ -26,8 +19,8 @@ def test_register_user():
 
 
 @pytest.mark.django_db
-def test_register_userexist():
-    client = api_client()
+def test_register_userexist(api_client):
+    client, _ = api_client("test_user")
     url = reverse("register_test-list")
     payload = dict(username="test_user", password="test_password")
     response = client.post(url, payload)
@@ -36,17 +29,105 @@ def test_register_userexist():
 
 
 @pytest.mark.django_db
-def test_get_user():
-    client = api_client()
+def test_register_user_can_sign_in():
+    url = reverse("register_test-list")
+    payload = dict(username="test_user2", password="test_password")
+    response = APIClient().post(url, payload)
+    assert response.status_code == 201
+
+    user = User.objects.get(username="test_user2")
+    assert user.check_password("test_password")
+    response = APIClient().post(reverse("token_obtain_pair"), payload)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_register_user_json():
+    url = reverse("register_test-list")
+    payload = dict(username="test_user2", password="test_password")
+    response = APIClient().post(url, payload, format="json")
+    assert response.status_code == 201
+    assert User.objects.filter(username="test_user2").exists()
+
+
+@pytest.mark.django_db
+def test_register_user_missing_password():
+    url = reverse("register_test-list")
+    response = APIClient().post(url, dict(username="test_user2"))
+    assert response.status_code == 400
+    assert response.data["password"][0] == "This field is required."
+    assert not User.objects.filter(username="test_user2").exists()
+
+
+@pytest.mark.django_db
+def test_register_user_hashes_on_the_pool(monkeypatch):
+    threads = []
+    make_password = registration.hashers.make_password
+
+    def recorded(password):
+        threads.append(registration.threading.current_thread().name)
+        return make_password(password)
+
+    monkeypatch.setattr(registration.hashers, "make_password", recorded)
+    url = reverse("register_test-list")
+    payload = dict(username="test_user2", password="test_password")
+    assert APIClient().post(url, payload).status_code == 201
+    assert threads[0].startswith("password-hash")
+
+
+@pytest.mark.django_db
+@override_settings(PASSWORD_HASHERS=["mow_api.hashers.ScryptPasswordHasher"])
+def test_register_user_scrypt():
+    url = reverse("register_test-list")
+    payload = dict(username="test_user2", password="test_password")
+    assert APIClient().post(url, payload).status_code == 201
+
+    user = User.objects.get(username="test_user2")
+    assert identify_hasher(user.password).algorithm == "scrypt"
+    assert user.check_password("test_password")
+
+
+@pytest.mark.django_db
+def test_get_user(api_client):
+    client, _ = api_client("test_user")
     url = reverse("user_test-list")
     response = client.get(url)
     data = response.data
-    assert data[0]["username"] == "test_user"
+    assert data["results"][0]["username"] == "test_user"
 
 
 @pytest.mark.django_db
-def test_tokens():
-    client = api_client()
+def test_get_users_paginated(api_client):
+    client, _ = api_client("test_user")
+    for i in range(3):
+        User.objects.create_user(username=f"reader_{i}")
+    url = reverse("user_test-list")
+
+    response = client.get(url, {"limit": 2})
+    data = response.data
+    assert [user["username"] for user in data["results"]] == ["reader_2", "reader_1"]
+    response = client.get(data["next"])
+    data = response.data
+    assert [user["username"] for user in data["results"]] == ["reader_0", "test_user"]
+    assert data["next"] is None
+
+
+@pytest.mark.django_db
+def test_get_users_by_username_prefix(api_client):
+    client, _ = api_client("test_user")
+    for name in ("reader_1", "Reader_2", "writer_1"):
+        User.objects.create_user(username=name)
+    url = reverse("user_test-list")
+
+    response = client.get(url, {"username": "reader_", "ordering": "old"})
+    assert [user["username"] for user in response.data["results"]] == ["reader_1"]
+    response = client.get(url, {"username": "_"})
+    assert response.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_tokens(api_client):
+    client, _ = api_client("test_user")
     url = reverse("token_obtain_pair")
     payload = dict(username="test_user", password="passwd")
     response = client.post(url, payload)
@@ -54,8 +135,8 @@ def test_tokens():
 
 
 @pytest.mark.django_db
-def test_token_refresh():
-    client = api_client()
+def test_token_refresh(api_client):
+    client, _ = api_client("test_user")
     url = reverse("token_refresh")
     payload = dict(username="test_user", password="passwd")
     response = client.post("/api/token", payload)
@@ -65,16 +146,16 @@ def test_token_refresh():
 
 
 @pytest.mark.django_db
-def test_funfact():
-    client = api_client()
+def test_funfact(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     response = client.get(url)
     assert response.status_code == 200
 
 
 @pytest.mark.django_db
-def test_add_funfact():
-    client = api_client()
+def test_add_funfact(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     payload = dict(fact_text="test fact")
     response = client.post(url, payload)
@@ -91,8 +172,8 @@ def test_add_funfact_unauthorized():
 
 
 @pytest.mark.django_db
-def test_add_funfact_empty():
-    client = api_client()
+def test_add_funfact_empty(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     payload = dict(fact_text="")
     response = client.post(url, payload)
@@ -100,8 +181,8 @@ def test_add_funfact_empty():
 
 
 @pytest.mark.django_db
-def test_add_funfact_long():
-    client = api_client()
+def test_add_funfact_long(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     payload = dict(fact_text="test fact" * 100)
     response = client.post(url, payload)
@@ -109,12 +190,13 @@ def test_add_funfact_long():
 
 
 @pytest.mark.django_db
-def test_add_comment():
-    client = api_client()
+def test_add_comment(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     payload = dict(fact_text="test fact")
     response = client.post(url, payload)
-    url = reverse("comments_test-list", kwargs={"fact_id": 3})
+    fact_id = response.data["id"]
+    url = reverse("comments_test-list", kwargs={"fact_id": fact_id})
     payload = dict(comment_text="test comment", username="test_user", parent_id=0)
     response = client.post(url, payload)
     assert response.status_code == 201
@@ -133,40 +215,44 @@ def test_add_comment_unauthorized():
 
 
 @pytest.mark.django_db
-def test_add_comment_empty():
-    client = api_client()
+def test_add_comment_empty(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     payload = dict(fact_text="test fact")
     response = client.post(url, payload)
-    url = reverse("comments_test-list", kwargs={"fact_id": 3})
+    fact_id = response.data["id"]
+    url = reverse("comments_test-list", kwargs={"fact_id": fact_id})
     payload = dict(comment_text="", username="test_user", parent_id=0)
     response = client.post(url, payload)
     assert response.status_code == 400
 
 
 @pytest.mark.django_db
-def test_add_comment_long():
-    client = api_client()
+def test_add_comment_long(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     payload = dict(fact_text="test fact")
     response = client.post(url, payload)
-    url = reverse("comments_test-list", kwargs={"fact_id": 5})
+    fact_id = response.data["id"]
+    url = reverse("comments_test-list", kwargs={"fact_id": fact_id})
     payload = dict(comment_text="test comment" * 100, username="test_user", parent_id=0)
     response = client.post(url, payload)
     assert response.status_code == 201
 
 
 @pytest.mark.django_db
-def test_add_reply():
-    client = api_client()
+def test_add_reply(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     payload = dict(fact_text="test fact")
     response = client.post(url, payload)
-    url = reverse("comments_test-list", kwargs={"fact_id": 6})
+    fact_id = response.data["id"]
+    url = reverse("comments_test-list", kwargs={"fact_id": fact_id})
     payload = dict(comment_text="test comment", username="test_user", parent_id=0)
     response = client.post(url, payload)
-    url = reverse("comments_test-list", kwargs={"fact_id": 6})
-    payload = dict(comment_text="test reply", username="test_user", parent_id=3)
+    parent_id = response.data["id"]
+    url = reverse("comments_test-list", kwargs={"fact_id": fact_id})
+    payload = dict(comment_text="test reply", username="test_user", parent_id=parent_id)
     response = client.post(url, payload)
     assert response.status_code == 201
 
@@ -187,15 +273,17 @@ def test_add_reply_unauthorized():
 
 
 @pytest.mark.django_db
-def test_add_reply_empty():
-    client = api_client()
+def test_add_reply_empty(api_client):
+    client, _ = api_client("test_user")
     url = reverse("funfacts_test-list")
     payload = dict(fact_text="test fact")
     response = client.post(url, payload)
-    url = reverse("comments_test-list", kwargs={"fact_id": 6})
+    fact_id = response.data["id"]
+    url = reverse("comments_test-list", kwargs={"fact_id": fact_id})
     payload = dict(comment_text="test comment", username="test_user", parent_id=0)
     response = client.post(url, payload)
-    url = reverse("comments_test-list", kwargs={"fact_id": 6})
-    payload = dict(comment_text="", username="test_user", parent_id=3)
+    parent_id = response.data["id"]
+    url = reverse("comments_test-list", kwargs={"fact_id": fact_id})
+    payload = dict(comment_text="", username="test_user", parent_id=parent_id)
     response = client.post(url, payload)
     assert response.status_code == 400
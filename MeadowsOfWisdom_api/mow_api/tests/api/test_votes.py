@@ -0,0 +1,307 @@
+import threading
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mow_api.models import FunFact, FunFactComment, FunFactVote, hot_score
+from mow_api.tests.conftest import comment_votes_url, fact_votes_url
+
+
+@pytest.mark.django_db
+def test_fact_vote_counters_follow_votes(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    client.post(fact_votes_url(fact, "upvote"))
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (1, 0, 1)
+
+    client.patch(fact_votes_url(fact, "downvote"))
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (0, 1, -1)
+
+    client.delete(fact_votes_url(fact, "downvote"))
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_comment_vote_counters_follow_votes(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    comment = FunFactComment.objects.create(
+        author=user, fact=fact, comment_text="test comment"
+    )
+
+    client.post(comment_votes_url(comment, "downvote"))
+    comment.refresh_from_db()
+    assert (comment.upvote_count, comment.downvote_count, comment.score) == (0, 1, -1)
+
+    client.patch(comment_votes_url(comment, "upvote"))
+    comment.refresh_from_db()
+    assert (comment.upvote_count, comment.downvote_count, comment.score) == (1, 0, 1)
+
+
+@pytest.mark.django_db
+def test_vote_counters_follow_deleted_voters(api_client):
+    client, user = api_client("voter")
+    other, voter = api_client("deleted_voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    comment = FunFactComment.objects.create(
+        author=user, fact=fact, comment_text="test comment"
+    )
+    FunFact.objects.filter(pk=fact.pk).update(sharded_counters=True)
+    client.put(fact_votes_url(fact, "upvote"))
+    other.put(fact_votes_url(fact, "upvote"))
+    other.put(comment_votes_url(comment, "downvote"))
+
+    voter.delete()
+    call_command("refresh_rankings", stdout=StringIO())
+
+    fact.refresh_from_db()
+    comment.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (1, 0, 1)
+    assert (comment.upvote_count, comment.downvote_count, comment.score) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_duplicate_vote_keeps_counters(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    client.post(fact_votes_url(fact, "upvote"))
+    response = client.post(fact_votes_url(fact, "upvote"))
+    fact.refresh_from_db()
+    assert response.status_code == 409
+    assert fact.score == 1
+
+
+@pytest.mark.django_db
+def test_invalid_vote_value(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    response = client.post(fact_votes_url(fact, "sideways"))
+    assert response.status_code == 400
+    assert not FunFactVote.objects.exists()
+
+
+@pytest.mark.django_db
+def test_serializer_reads_stored_score(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    client.post(fact_votes_url(fact, "upvote"))
+
+    response = client.get(reverse("funfacts_test-detail", kwargs={"pk": fact.id}))
+    assert response.data["countVotes"] == 1
+    assert response.data["upvoteCount"] == 1
+
+
+@pytest.mark.django_db
+def test_recount_votes_repairs_drift(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    other = User.objects.create_user(username="other_voter", password="passwd")
+    FunFactVote.objects.create(author=user, tagged_object=fact, vote="upvote")
+    FunFactVote.objects.create(author=other, tagged_object=fact, vote="upvote")
+    FunFact.objects.filter(pk=fact.pk).update(upvote_count=7, score=-3)
+
+    call_command("recount_votes", stdout=StringIO())
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (2, 0, 2)
+
+
+@pytest.mark.django_db
+def test_put_vote_upserts_and_returns_score(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    response = client.put(fact_votes_url(fact, "upvote"))
+    assert response.status_code == 200
+    assert response.data["countVotes"] == 1
+    assert response.data["userReaction"] == "upvote"
+
+    response = client.put(fact_votes_url(fact, "upvote"))
+    assert response.data["countVotes"] == 1
+
+    response = client.put(fact_votes_url(fact, "downvote"))
+    assert (response.data["upvoteCount"], response.data["downvoteCount"]) == (0, 1)
+    assert fact.tags.get(author=user).vote == "downvote"
+
+    response = client.put(fact_votes_url(fact, "none"))
+    assert response.data["countVotes"] == 0
+    assert not fact.tags.exists()
+
+    response = client.put(fact_votes_url(fact, "none"))
+    assert response.data["countVotes"] == 0
+
+
+@pytest.mark.django_db
+def test_put_vote_is_two_statements(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    client.force_authenticate(user)
+
+    with CaptureQueriesContext(connection) as context:
+        client.put(fact_votes_url(fact, "upvote"))
+
+    queries = [
+        query
+        for query in context.captured_queries
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
+    assert len(queries) == 2
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.score) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_put_vote_on_comment(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    comment = FunFactComment.objects.create(
+        author=user, fact=fact, comment_text="test comment"
+    )
+
+    response = client.put(comment_votes_url(comment, "downvote"))
+    comment.refresh_from_db()
+    assert response.data["countVotes"] == comment.score == -1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fact_id", [999999, 2**31, 2**63])
+def test_put_vote_on_missing_object(api_client, fact_id):
+    client, user = api_client("voter")
+    response = client.put(
+        reverse("fact_votes", kwargs={"fact_id": fact_id, "vote_value": "upvote"})
+    )
+    assert response.status_code == 404
+    assert not FunFactVote.objects.exists()
+
+
+def race(first, second):
+    """
+    Run ``first`` in a transaction that stays open until ``second`` has
+    started on another connection, then let both finish.
+    """
+    started = threading.Event()
+
+    def run_first():
+        try:
+            with transaction.atomic():
+                first()
+                started.set()
+                # Give the second connection time to run into the first.
+                threading.Event().wait(0.3)
+        finally:
+            started.set()
+            connections.close_all()
+
+    def run_second():
+        try:
+            started.wait()
+            second()
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run_first), threading.Thread(target=run_second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("second", ["put_vote", "apply_votes"])
+def test_concurrent_first_votes_count_once(second):
+    user = User.objects.create_user(username="voter", password="passwd")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    def put_vote():
+        FunFactVote.objects.put_vote(user, FunFact, fact.id, "upvote")
+
+    def apply_votes():
+        with transaction.atomic():
+            FunFactVote.objects.apply_votes(user, FunFact, {fact.id: "upvote"})
+
+    race(put_vote, {"put_vote": put_vote, "apply_votes": apply_votes}[second])
+
+    fact.refresh_from_db()
+    assert FunFactVote.objects.count() == 1
+    assert (fact.upvote_count, fact.score) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_batch_votes(api_client):
+    client, user = api_client("voter")
+    facts = [FunFact.objects.create(author=user, fact_text=str(i)) for i in range(3)]
+    comment = FunFactComment.objects.create(
+        author=user, fact=facts[0], comment_text="test comment"
+    )
+    FunFactVote.objects.create(author=user, tagged_object=facts[2], vote="upvote")
+    FunFact.objects.filter(pk=facts[2].pk).update(upvote_count=1, score=1)
+
+    payload = {
+        "votes": [
+            {"target": "fact", "id": facts[0].id, "vote": "downvote"},
+            {"target": "fact", "id": facts[0].id, "vote": "upvote"},
+            {"target": "fact", "id": facts[1].id, "vote": "downvote"},
+            {"target": "fact", "id": facts[2].id, "vote": "none"},
+            {"target": "comment", "id": comment.id, "vote": "upvote"},
+            {"target": "fact", "id": 999999, "vote": "upvote"},
+            {"target": "planet", "id": 1, "vote": "upvote"},
+        ]
+    }
+    response = client.post(reverse("batch_votes"), payload, format="json")
+
+    statuses = [result["status"] for result in response.data["results"]]
+    assert statuses == ["applied"] * 5 + ["not_found", "invalid"]
+    scores = dict(FunFact.objects.values_list("id", "score"))
+    assert [scores[fact.id] for fact in facts] == [1, -1, 0]
+    comment.refresh_from_db()
+    assert comment.score == 1
+    assert FunFactVote.objects.get(object_id=facts[0].id).vote == "upvote"
+
+
+@pytest.mark.django_db
+def test_batch_votes_size_limit(api_client):
+    client, user = api_client("voter")
+    payload = {"votes": [{"target": "fact", "id": 1, "vote": "upvote"}] * 101}
+    response = client.post(reverse("batch_votes"), payload, format="json")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("payload", [[], "votes", 1])
+def test_batch_votes_expects_an_object(api_client, payload):
+    client, _ = api_client("voter")
+    response = client.post(reverse("batch_votes"), payload, format="json")
+    assert response.status_code == 400
+    assert "votes" in response.json()
+
+
+@pytest.mark.django_db
+def test_batch_votes_camelize_errors(api_client):
+    client, _ = api_client("voter")
+    payload = {"votes": ["upvote"]}
+    response = client.post(reverse("batch_votes"), payload, format="json")
+    assert list(response.json()["results"][0]["errors"]) == ["nonFieldErrors"]
+
+
+@pytest.mark.django_db
+def test_votes_refresh_hot_score(api_client):
+    client, user = api_client("voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    assert fact.hot_score == pytest.approx(hot_score(0, fact.created_at))
+
+    client.put(fact_votes_url(fact, "upvote"))
+    fact.refresh_from_db()
+    assert fact.hot_score == pytest.approx(hot_score(1, fact.created_at))
+
+    client.patch(fact_votes_url(fact, "downvote"))
+    fact.refresh_from_db()
+    assert fact.hot_score == pytest.approx(hot_score(-1, fact.created_at))
@@ -0,0 +1,116 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from mow_api import write_behind
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+from mow_api.tests.conftest import fact_votes_url
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    # A long interval keeps the worker thread asleep, the tests flush by hand.
+    vote_buffer = write_behind.VoteBuffer(flush_interval=3600, flush_size=1000)
+    monkeypatch.setattr(write_behind, "_buffer", vote_buffer)
+    with override_settings(VOTE_WRITE_BEHIND=True):
+        yield vote_buffer
+    vote_buffer.pending.clear()
+
+
+@pytest.mark.django_db
+def test_votes_are_queued_until_flushed(api_client, buffer):
+    client, user = api_client("queued_voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    response = client.post(fact_votes_url(fact, "upvote"))
+
+    assert response.status_code == 202
+    assert not FunFactVote.objects.exists()
+    fact.refresh_from_db()
+    assert fact.upvote_count == 0
+
+    assert buffer.flush() == 1
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (1, 0, 1)
+    assert FunFactVote.objects.get().vote == FunFactVote.VoteType.UPVOTE
+
+
+@pytest.mark.django_db
+def test_voter_sees_own_queued_vote(api_client, buffer):
+    client, user = api_client("reading_voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+    FunFactVote.objects.put_vote(user, FunFact, fact.id, "upvote")
+
+    client.patch(fact_votes_url(fact, "downvote"))
+    data = client.get(reverse("funfacts_test-detail", args=[fact.id])).data
+
+    assert data["userReaction"] == "downvote"
+    assert (data["upvoteCount"], data["downvoteCount"], data["countVotes"]) == (
+        0,
+        1,
+        -1,
+    )
+
+    other, _ = api_client("other_reader")
+    data = other.get(reverse("funfacts_test-detail", args=[fact.id])).data
+    assert data["userReaction"] is None
+    assert data["countVotes"] == 1
+
+
+@pytest.mark.django_db
+def test_flush_keeps_the_latest_vote_and_sums_deltas(api_client, buffer):
+    first, first_user = api_client("first_burst_voter")
+    second, _ = api_client("second_burst_voter")
+    fact = FunFact.objects.create(author=first_user, fact_text="test fact")
+    comment = FunFactComment.objects.create(
+        author=first_user, fact=fact, comment_text="test comment"
+    )
+
+    first.put(fact_votes_url(fact, "upvote"))
+    first.put(fact_votes_url(fact, "downvote"))
+    second.post(fact_votes_url(fact, "upvote"))
+    second.delete(fact_votes_url(fact, "upvote"))
+    second.post(
+        reverse(
+            "comment_votes", kwargs={"comment_id": comment.id, "vote_value": "upvote"}
+        )
+    )
+
+    assert buffer.flush() == 3
+    fact.refresh_from_db()
+    comment.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (0, 1, -1)
+    assert (comment.upvote_count, comment.score) == (1, 1)
+    assert FunFactVote.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_invalid_vote_is_rejected_before_queueing(api_client, buffer):
+    client, user = api_client("invalid_voter")
+    fact = FunFact.objects.create(author=user, fact_text="test fact")
+
+    responses = [
+        client.post(fact_votes_url(fact, "sideways")),
+        client.post(fact_votes_url(fact, "none")),
+        client.patch(fact_votes_url(fact, "none")),
+    ]
+
+    assert [response.status_code for response in responses] == [400] * 3
+    assert client.put(fact_votes_url(fact, "none")).status_code == 202
+    assert buffer.flush() == 1
+
+
+@pytest.mark.django_db
+def test_votes_of_deleted_users_are_dropped_alone(api_client, buffer):
+    deleted, deleted_user = api_client("deleted_voter")
+    kept, kept_user = api_client("kept_voter")
+    fact = FunFact.objects.create(author=kept_user, fact_text="test fact")
+
+    deleted.put(fact_votes_url(fact, "downvote"))
+    kept.put(fact_votes_url(fact, "upvote"))
+    deleted_user.delete()
+
+    assert buffer.flush() == 1
+    assert not buffer.pending
+    fact.refresh_from_db()
+    assert (fact.upvote_count, fact.downvote_count, fact.score) == (1, 0, 1)
+    assert FunFactVote.objects.get().author == kept_user
@@ -0,0 +1,80 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.urls import reverse
+from mow_api.authentication import credentials_cache, user_cache
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def fact_votes_url(fact, vote_value):
+    return reverse("fact_votes", kwargs={"fact_id": fact.id, "vote_value": vote_value})
+
+
+def comment_votes_url(comment, vote_value):
+    return reverse(
+        "comment_votes", kwargs={"comment_id": comment.id, "vote_value": vote_value}
+    )
+
+
+def add_facts(author, count):
+    return [
+        FunFact.objects.create(author=author, fact_text=f"fact {i}")
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    user_cache.clear()
+    credentials_cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    """
+    Create a user and return it with a client authenticated as that user by a
+    Bearer token.
+    """
+
+    def create(username, is_staff=False):
+        user = User.objects.create_user(
+            username=username, password="passwd", is_staff=is_staff
+        )
+        client = APIClient()
+        refresh = RefreshToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+        return client, user
+
+    return create
+
+
+@pytest.fixture
+def author():
+    return User.objects.create_user(username="author")
+
+
+@pytest.fixture
+def voted_thread(api_client):
+    """
+    Facts with awkward texts, votes and sharded counters, and a reply, all by
+    the ``reader`` user. Returns that user's client, the first fact and the
+    reply.
+    """
+    client, user = api_client("reader")
+    texts = ["plain", "ünïcödé ✓", 'quotes " and \\ slashes', "line separator"]
+    facts = [FunFact.objects.create(author=user, fact_text=text) for text in texts]
+    FunFactVote.objects.put_vote(user, FunFact, facts[0].id, "upvote")
+    FunFactVote.objects.put_vote(user, FunFact, facts[1].id, "downvote")
+    FunFact.objects.filter(pk=facts[2].pk).update(sharded_counters=True)
+    FunFactVote.objects.put_vote(user, FunFact, facts[2].id, "upvote")
+    root = FunFactComment.objects.create(author=user, fact=facts[0], comment_text="a")
+    reply = FunFactComment.objects.create(
+        author=user, fact=facts[0], parent=root, comment_text="b "
+    )
+    FunFactVote.objects.put_vote(user, FunFactComment, reply.id, "upvote")
+    return client, facts[0], reply
@@ -0,0 +1,139 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from mow_api.models import FunFact, FunFactComment, FunFactVote
+
+
+def export(tmp_path, dataset, format="ndjson"):
+    path = tmp_path / f"{dataset}.{format}"
+    call_command("export_meadows", dataset, f"--format={format}", f"--output={path}")
+    return path
+
+
+def add_meadow():
+    users = [User.objects.create_user(username=f"seed_{i}") for i in range(2)]
+    facts = [
+        FunFact.objects.create(author=users[i % 2], fact_text=f"fact\t{i}\n\\")
+        for i in range(3)
+    ]
+    root = FunFactComment.objects.create(
+        author=users[0], fact=facts[0], comment_text="root"
+    )
+    reply = FunFactComment.objects.create(
+        author=users[1], fact=facts[0], parent=root, comment_text='reply, quoted "'
+    )
+    FunFactComment.objects.create(
+        author=users[0], fact=facts[0], parent=reply, comment_text="nested"
+    )
+    for user in users:
+        FunFactVote.objects.put_vote(user, FunFact, facts[0].id, "upvote")
+        FunFactVote.objects.put_vote(user, FunFactComment, reply.id, "downvote")
+    return users
+
+
+def snapshot():
+    facts = FunFact.objects.order_by("id").values_list(
+        "id",
+        "author_id",
+        "fact_text",
+        "score",
+        "upvote_count",
+        "comment_count",
+        "created_at",
+        "updated_at",
+    )
+    comments = FunFactComment.objects.order_by("id").values_list(
+        "id",
+        "fact_id",
+        "parent_id",
+        "path",
+        "depth",
+        "reply_count",
+        "score",
+        "created_at",
+    )
+    votes = FunFactVote.objects.order_by("author_id", "object_id").values_list(
+        "author_id", "content_type_id", "object_id", "vote"
+    )
+    return list(facts), list(comments), list(votes)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+@pytest.mark.parametrize("copy", [False, True])
+def test_import_restores_an_export(tmp_path, format, copy):
+    add_meadow()
+    before = snapshot()
+    hot_scores = list(
+        FunFact.objects.order_by("id").values_list("hot_score", flat=True)
+    )
+    files = {
+        dataset: export(tmp_path, dataset, format)
+        for dataset in ("facts", "comments", "votes")
+    }
+    FunFact.objects.all().delete()
+    FunFactVote.objects.all().delete()
+
+    args = [f"--{dataset}={path}" for dataset, path in files.items()]
+    if copy:
+        args.append("--copy")
+    out = StringIO()
+    call_command("import_meadows", *args, "--batch-size=2", stdout=out)
+
+    assert "Loaded 3 facts" in out.getvalue()
+    assert snapshot() == before
+    # Created facts are ranked from the time of save(), imports from created_at.
+    assert list(FunFact.objects.order_by("id").values_list("hot_score", flat=True)) == [
+        pytest.approx(hot_score, abs=1e-6) for hot_score in hot_scores
+    ]
+    assert FunFact.objects.search("fact").count() == 3
+    fact = FunFact.objects.create(author=User.objects.first(), fact_text="new")
+    assert fact.id > max(row[0] for row in before[0])
+
+
+@pytest.mark.django_db
+def test_import_links_replies_listed_before_their_parent(tmp_path):
+    user = User.objects.create_user(username="seeder")
+    fact = FunFact.objects.create(author=user, fact_text="fact")
+    comments = tmp_path / "comments.ndjson"
+    comments.write_text(
+        json.dumps(
+            {
+                "id": 11,
+                "factId": fact.id,
+                "parentId": 10,
+                "userId": user.id,
+                "commentText": "b",
+            }
+        )
+        + "\n"
+        + json.dumps(
+            {"id": 10, "factId": fact.id, "userId": user.id, "commentText": "a"}
+        )
+        + "\n"
+    )
+
+    call_command("import_meadows", f"--comments={comments}", stdout=StringIO())
+
+    reply = FunFactComment.objects.get(pk=11)
+    assert (reply.parent_id, reply.depth) == (10, 1)
+    assert reply.get_ancestor_ids() == [10]
+    assert FunFactComment.objects.get(pk=10).reply_count == 1
+    fact.refresh_from_db()
+    assert fact.comment_count == 2
+
+
+@pytest.mark.django_db
+def test_import_fails_as_a_whole(tmp_path):
+    user = User.objects.create_user(username="seeder")
+    facts = tmp_path / "facts.csv"
+    facts.write_text(f"id,userId,factText\n1,{user.id},fine\n2,{user.id + 100},bad\n")
+
+    with pytest.raises(CommandError):
+        call_command("import_meadows", f"--facts={facts}", stdout=StringIO())
+
+    with pytest.raises(CommandError):
+        call_command("import_meadows", stdout=StringIO())
@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+
+class CommentTree:
+    """
+    Reply tree of a fun fact built from one flat, chronologically ordered list
+    of comments.
+
+    Nesting is done in a single pass over the list and ``layout`` walks the
+    tree iteratively, so arbitrarily deep threads cost O(n) and never hit the
+    recursion limit.
+    """
+
+    def __init__(self, comments):
+        self.children = defaultdict(list)
+        for comment in comments:
+            self.children[comment.parent_id].append(comment)
+
+    def siblings(self, parent_id, after=None):
+        siblings = self.children.get(parent_id, [])
+        if after is None:
+            return siblings
+        for position, comment in enumerate(siblings, start=1):
+            if comment.id == after:
+                return siblings[position:]
+        return None
+
+    def layout(self, siblings, parent_id, max_depth, max_replies):
+        """
+        Pick the comments to show below ``parent_id``, at most ``max_replies``
+        per level and ``max_depth`` levels deep.
+
+        Returns every shown comment and the root ``Level`` of the layout.
+        Every level that was cut short knows how many comments it hides and
+        the last comment it shows, which is what "more replies" links need.
+        """
+        shown = []
+        root = Level(parent_id, siblings, max_replies)
+        stack = [(root, 1)]
+        while stack:
+            level, depth = stack.pop()
+            for comment in level.comments:
+                shown.append(comment)
+                replies = self.children.get(comment.id, [])
+                if depth < max_depth:
+                    child = Level(comment.id, replies, max_replies)
+                    stack.append((child, depth + 1))
+                else:
+                    child = Level(comment.id, replies, 0)
+                level.replies[comment.id] = child
+        return shown, root
+
+
+class Level:
+    def __init__(self, parent_id, siblings, max_replies):
+        self.parent_id = parent_id
+        self.comments = siblings[:max_replies]
+        self.hidden = len(siblings) - len(self.comments)
+        self.replies = {}
+
+    @property
+    def last_shown_id(self):
+        return self.comments[-1].id if self.comments else None
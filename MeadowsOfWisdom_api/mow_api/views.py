@@ -1,16 +1,46 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
-from django.http import Http404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from django.views import View
+from djangorestframework_camel_case.util import camelize
+from mow_api import caching, registration, write_behind
+from mow_api.camel import camel_key, camelize_keys
+from mow_api.conditional import ConditionalListMixin
+from mow_api.export import EXPORTS, CSVRenderer, NDJSONRenderer, parse_since
 from mow_api.models import FunFact, FunFactComment, FunFactVote
+from mow_api.readers import CommentReader, FunFactReader, ReaderListMixin
+from mow_api.pagination import (
+    CommentPagination,
+    FunFactPagination,
+    SearchPagination,
+    UserPagination,
+)
 from mow_api.serializers import (
     FunFactSerializer,
     UserSerializer,
     FunFactCommentSerializer,
+    SearchResultSerializer,
+    VoteOperationSerializer,
 )
-from rest_framework import permissions, response, status, viewsets
+from mow_api.threads import CommentTree
+from rest_framework import generics, permissions, response, status, viewsets
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotAuthenticated, NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.exceptions import APIException
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 
 
 class ReadOnlyOrAuthor(permissions.IsAuthenticatedOrReadOnly):
@@ -31,9 +61,24 @@ class UserViewSet(viewsets.ModelViewSet):
     API endpoint that allows to perform actions on users.
     """
 
-    queryset = User.objects.all().order_by("-date_joined")
+    queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated | IsPostRequest]
+    pagination_class = UserPagination
+
+    def get_queryset(self):
+        """
+        The listing pages through the ``date_joined`` index and loads only the
+        serialized columns. ``username`` narrows it to a username prefix.
+        """
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+        queryset = queryset.only("id", "username", "date_joined")
+        prefix = self.request.query_params.get("username")
+        if prefix:
+            queryset = queryset.filter(username__startswith=prefix)
+        return queryset
 
     def create(self, request, *args, **kwargs):
         super().create(request, *args, **kwargs)
@@ -42,7 +87,66 @@ class UserViewSet(viewsets.ModelViewSet):
         )
 
 
-class FunFactViewSet(viewsets.ModelViewSet):
+class CsrfExemptView(View):
+    """
+    A plain Django view exempt from CSRF checks like every ``APIView``: the
+    API is token authenticated.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # See APIView.as_view.
+        view.csrf_exempt = True
+        return view
+
+
+class RegisterView(CsrfExemptView):
+    """
+    Sign-up. This is an async view: under ASGI, the password is hashed on
+    the bounded pool of ``mow_api.registration`` while the event loop serves
+    other requests. The ``201`` is sent as soon as the user row is inserted.
+    """
+
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+
+    async def post(self, request, *args, **kwargs):
+        request = Request(request, parsers=[parser() for parser in self.parser_classes])
+        try:
+            serializer = UserSerializer(data=request.data)
+        except APIException as error:
+            return self.respond({"detail": error.detail}, error.status_code)
+        if not await sync_to_async(serializer.is_valid)():
+            return self.respond(
+                camelize(serializer.errors), status.HTTP_400_BAD_REQUEST
+            )
+
+        data = serializer.validated_data
+        password = await registration.make_password(data["password"])
+        try:
+            await User.objects.acreate(
+                username=User.normalize_username(data["username"]), password=password
+            )
+        except IntegrityError:
+            # Lost a race for the username since the validation.
+            message = User._meta.get_field("username").error_messages["unique"]
+            return self.respond({"username": [message]}, status.HTTP_400_BAD_REQUEST)
+        return self.respond({"message": "successful"}, status.HTTP_201_CREATED)
+
+    def respond(self, data, status_code):
+        result = response.Response(data, status=status_code)
+        result.accepted_renderer = JSONRenderer()
+        result.accepted_media_type = JSONRenderer.media_type
+        result.renderer_context = {}
+        return result
+
+
+class FunFactViewSet(
+    caching.AnonymousCacheMixin,
+    ConditionalListMixin,
+    ReaderListMixin,
+    viewsets.ModelViewSet,
+):
     """
     API endpoint that allows to perform actions on fun facts.
     """
@@ -50,10 +154,18 @@ class FunFactViewSet(viewsets.ModelViewSet):
     queryset = FunFact.objects.all()
     serializer_class = FunFactSerializer
     permission_classes = [ReadOnlyOrAuthor]
+    pagination_class = FunFactPagination
+    list_reader = FunFactReader
+
+    def get_queryset(self):
+        return super().get_queryset().with_listing_data(self.request.user)
 
     def get_serializer_context(self):
         return {"request": self.request}
 
+    def get_validator_queryset(self):
+        return FunFact.objects.all()
+
     @property
     def author(self):
         return self.request.user
@@ -73,13 +185,124 @@ class FunFactViewSet(viewsets.ModelViewSet):
         serializer.save(**self.get_save_kwargs())
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class TokenObtainView(TokenObtainPairView):
+    """
+    Issue a token pair for the username and password in the body or in a Basic
+    ``Authorization`` header. This is the one endpoint taking Basic credentials
+    when ``BASIC_AUTH_POLICY`` is ``token``.
+    """
+
+    authentication_classes = [BasicAuthentication]
+
+    def post(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return super().post(request, *args, **kwargs)
+        refresh = RefreshToken.for_user(request.user)
+        return response.Response(
+            {"refresh": str(refresh), "access": str(refresh.access_token)}
+        )
+
+
+class CacheStatsView(APIView):
+    """
+    Hit and miss counters of the anonymous fun fact response cache.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, **kwargs):
+        return response.Response(camelize_keys(caching.stats()))
+
+
+class ExportView(APIView):
+    """
+    Stream a whole table, ``facts``, ``comments`` or ``votes``, as NDJSON or,
+    with ``format=csv``, as CSV. ``since`` resumes an export after an id or
+    from an ``updated_at`` timestamp, see ``mow_api.export``. Under ASGI the
+    export is streamed by an async iterator, which Django does not buffer.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    chunk_size = 2000
+
+    def get(self, request, dataset, **kwargs):
+        export_class = EXPORTS.get(dataset)
+        if export_class is None:
+            raise NotFound(f"Expected one of: {', '.join(EXPORTS)}.")
+        try:
+            export = export_class(parse_since(request.query_params.get("since")))
+        except ValueError as error:
+            raise ValidationError({"since": str(error)})
+
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f"; charset={renderer.charset}"
+        if isinstance(request._request, ASGIRequest):
+            stream = export.astream
+        else:
+            stream = export.stream
+        result = StreamingHttpResponse(
+            stream(renderer.format, self.chunk_size), content_type=content_type
+        )
+        result[
+            "Content-Disposition"
+        ] = f'attachment; filename="{dataset}.{renderer.format}"'
+        return result
+
+
+class SearchView(generics.ListAPIView):
+    """
+    Full-text search over fun facts, or comments with ``type=comments``.
+
+    ``q`` takes web search syntax: quoted phrases, ``or`` and ``-word``.
+    Results come by relevance, with the matches in ``headline`` wrapped in
+    ``<mark>``. Comments are only searchable by signed in users, like their
+    listings.
+    """
+
+    serializer_class = SearchResultSerializer
+    pagination_class = SearchPagination
+    targets = {"facts": FunFact, "comments": FunFactComment}
+
+    def get_queryset(self):
+        text = self.request.query_params.get("q", "").strip()
+        if not text:
+            raise ValidationError({"q": "This query parameter is required."})
+        target = self.request.query_params.get("type", "facts")
+        model = self.targets.get(target)
+        if model is None:
+            raise ValidationError(
+                {"type": f"Expected one of: {', '.join(self.targets)}."}
+            )
+        if model is FunFactComment and not self.request.user.is_authenticated:
+            raise NotAuthenticated
+        return model.objects.select_related("author").search(text)
+
+
+class CommentsViewSet(ConditionalListMixin, ReaderListMixin, viewsets.ModelViewSet):
     queryset = FunFactComment.objects.all()
     serializer_class = FunFactCommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentPagination
+    list_reader = CommentReader
+    tree_max_depth = 10
+    tree_max_replies = 50
 
     def get_queryset(self):
-        return super().get_queryset().filter(fact=self.kwargs["fact_id"])
+        return (
+            super()
+            .get_queryset()
+            .filter(fact=self.kwargs["fact_id"])
+            .with_listing_data(self.request.user)
+        )
+
+    def get_validator_queryset(self):
+        return FunFactComment.objects.filter(fact=self.kwargs["fact_id"])
+
+    def get_generation_key(self, comment_id):
+        return caching.comment_key(comment_id)
 
     def get_save_kwargs(self):
         kwargs = {}
@@ -106,19 +329,122 @@ class CommentsViewSet(viewsets.ModelViewSet):
     @property
     def parent(self):
         parent_id = self.request.data.get("parent_id")
-        print("parent_id", parent_id)
         if parent_id is None:
             return None
         if parent_id == "0":
             return None
-        return get_object_or_404(FunFactComment, pk=parent_id)
+        return get_object_or_404(
+            FunFactComment, pk=parent_id, fact_id=self.kwargs["fact_id"]
+        )
 
     @property
     def comment_text(self):
         return self.request.data.get("comment_text")
 
     def perform_create(self, serializer):
-        serializer.save(**self.get_save_kwargs())
+        # The comment and reply counters are bumped by the post_save signal,
+        # in the same transaction as the insert.
+        with transaction.atomic():
+            serializer.save(**self.get_save_kwargs())
+
+    def get_tree_param(self, name, default):
+        try:
+            value = int(self.request.query_params[name])
+        except (KeyError, ValueError):
+            return default
+        return value if value > 0 else default
+
+    def get_more_replies(self, level):
+        if not level.hidden:
+            return None
+        url = self.request.build_absolute_uri()
+        if level.parent_id is None:
+            url = remove_query_param(url, "parent")
+        else:
+            url = replace_query_param(url, "parent", level.parent_id)
+        if level.last_shown_id is None:
+            url = remove_query_param(url, "after")
+        else:
+            url = replace_query_param(url, "after", level.last_shown_id)
+        return {"count": level.hidden, "next": url}
+
+    @action(detail=False, url_path="tree")
+    def tree(self, request, *args, **kwargs):
+        """
+        Return the comments of a fact nested by reply, loaded in one query.
+        ``parent`` narrows it to the subtree below one comment.
+
+        ``depth`` and ``replies`` limit how deep and how wide every level goes.
+        Levels that were cut short carry a ``more_replies`` link that resumes
+        them through the ``parent`` and ``after`` parameters.
+        """
+        queryset = self.get_queryset()
+        max_depth = self.get_tree_param("depth", self.tree_max_depth)
+        parent_id = self.get_tree_param("parent", None)
+        if parent_id is None:
+            level = 0
+        else:
+            parent = get_object_or_404(
+                FunFactComment.objects.only("path", "depth"),
+                pk=parent_id,
+                fact=self.kwargs["fact_id"],
+            )
+            queryset = queryset.filter(path__startswith=parent.descendants_prefix)
+            level = parent.depth + 1
+        # One level past the limit is loaded so cut levels can count what they hide.
+        queryset = queryset.filter(depth__lte=level + max_depth)
+
+        tree = CommentTree(queryset.order_by("created_at", "id"))
+        siblings = tree.siblings(parent_id, self.get_tree_param("after", None))
+        if siblings is None:
+            raise NotFound("Invalid cursor")
+
+        shown, root = tree.layout(
+            siblings,
+            parent_id,
+            max_depth=max_depth,
+            max_replies=self.get_tree_param("replies", self.tree_max_replies),
+        )
+        serializer = self.get_serializer(shown, many=True)
+        nodes = {node["id"]: node for node in serializer.data}
+
+        levels = [root]
+        while levels:
+            level = levels.pop()
+            for comment_id, child in level.replies.items():
+                node = nodes[comment_id]
+                node["replies"] = [nodes[reply.id] for reply in child.comments]
+                node[camel_key("more_replies")] = self.get_more_replies(child)
+                levels.append(child)
+
+        return response.Response(
+            camelize_keys(
+                {
+                    "results": [nodes[comment.id] for comment in root.comments],
+                    "more_replies": self.get_more_replies(root),
+                }
+            )
+        )
+
+    @action(detail=True)
+    def ancestors(self, request, *args, **kwargs):
+        """
+        Return the chain of comments above this one, root first.
+        """
+        comment = self.get_object()
+        ancestors = (
+            self.get_queryset()
+            .filter(pk__in=comment.get_ancestor_ids())
+            .order_by("depth")
+        )
+        serializer = self.get_serializer(ancestors, many=True)
+        return response.Response(serializer.data)
+
+    def perform_destroy(self, instance):
+        # Collect the whole subtree by path instead of one cascade per level.
+        FunFactComment.objects.filter(
+            Q(pk=instance.pk) | Q(path__startswith=instance.descendants_prefix)
+        ).delete()
 
     def destroy(self, request, *args, **kwargs):
         try:
@@ -141,92 +467,242 @@ class VoteNotFound(APIException):
     default_code = "vote_not_found"
 
 
+class InvalidVote(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "Vote must be either upvote or downvote"
+    default_code = "invalid_vote"
+
+
+def get_vote_value(kwargs, allow_none=False):
+    vote_value = kwargs["vote_value"]
+    if allow_none and vote_value == "none":
+        return None
+    if vote_value not in FunFactVote.VoteType.values:
+        raise InvalidVote
+    return vote_value
+
+
+def put_vote(user, model, object_id, kwargs):
+    """
+    Set the user's vote to the ``vote_value`` from the URL, where ``none``
+    withdraws it, and return the object's new counters.
+    """
+    vote_value = get_vote_value(kwargs, allow_none=True)
+    counters = FunFactVote.objects.put_vote(user, model, object_id, vote_value)
+    if counters is None:
+        raise Http404
+    upvote_count, downvote_count, score = counters
+    return response.Response(
+        camelize_keys(
+            {
+                "user_reaction": vote_value,
+                "count_votes": score,
+                "upvote_count": upvote_count,
+                "downvote_count": downvote_count,
+            }
+        ),
+        status=status.HTTP_200_OK,
+    )
+
+
+def buffered(model, lookup, withdraw=False, allow_none=False):
+    """
+    Queue the vote in the write-behind buffer instead of running the view
+    method when ``VOTE_WRITE_BEHIND`` is enabled. Queued votes behave like
+    ``PUT``: casting over an existing vote replaces it and withdrawing a
+    missing one is a no-op. ``withdraw`` marks the method removing the vote,
+    ``allow_none`` the one accepting ``none`` as its vote value.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, **kwargs):
+            buffer = write_behind.get_buffer()
+            if buffer is None:
+                return handler(self, request, **kwargs)
+            vote = None if withdraw else get_vote_value(kwargs, allow_none)
+            buffer.record(request.user, model, int(kwargs[lookup]), vote)
+            return response.Response(
+                {"message": "queued"}, status=status.HTTP_202_ACCEPTED
+            )
+
+        return wrapper
+
+    return decorator
+
+
 class CommentVotesView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @buffered(FunFactComment, "comment_id", allow_none=True)
+    def put(self, request, **kwargs):
+        comment_id = int(kwargs["comment_id"])
+        result = put_vote(self.request.user, FunFactComment, comment_id, kwargs)
+        caching.invalidate_comment(comment_id)
+        return result
+
+    @buffered(FunFactComment, "comment_id")
     def post(self, request, **kwargs):
         comment = get_object_or_404(FunFactComment, pk=kwargs["comment_id"])
         user = self.request.user
-        vote_value = kwargs["vote_value"]
+        vote_value = get_vote_value(kwargs)
 
         try:
-            FunFactVote.objects.create(
-                author=user, tagged_object=comment, vote=vote_value
-            )
+            with transaction.atomic():
+                FunFactVote.objects.create(
+                    author=user, tagged_object=comment, vote=vote_value
+                )
+                comment.shift_votes(added=vote_value)
             return response.Response(
                 {"message": "successful"}, status=status.HTTP_200_OK
             )
         except IntegrityError:
             raise VoteAlreadyExists
 
+    @buffered(FunFactComment, "comment_id", withdraw=True)
     def delete(self, request, **kwargs):
         comment = get_object_or_404(FunFactComment, pk=kwargs["comment_id"])
         user = self.request.user
-        try:
-            vote = comment.tags.get(author=user)
-        except FunFactVote.DoesNotExist:
-            raise VoteNotFound
-
-        vote.delete()
+        with transaction.atomic():
+            try:
+                vote = comment.tags.select_for_update().get(author=user)
+            except FunFactVote.DoesNotExist:
+                raise VoteNotFound
+
+            vote.delete()
+            comment.shift_votes(removed=vote.vote)
         return response.Response(
             {"message": "record deleted"}, status=status.HTTP_200_OK
         )
 
+    @buffered(FunFactComment, "comment_id")
     def patch(self, request, **kwargs):
         comment = get_object_or_404(FunFactComment, pk=self.kwargs["comment_id"])
         user = self.request.user
-        try:
-            vote = comment.tags.get(author=user)
-        except FunFactVote.DoesNotExist:
-            raise VoteNotFound
-
-        vote_value = self.kwargs["vote_value"]
-        vote.vote = vote_value
-        vote.save()
+        vote_value = get_vote_value(self.kwargs)
+        with transaction.atomic():
+            try:
+                vote = comment.tags.select_for_update().get(author=user)
+            except FunFactVote.DoesNotExist:
+                raise VoteNotFound
+
+            previous = vote.vote
+            vote.vote = vote_value
+            vote.save()
+            comment.shift_votes(removed=previous, added=vote_value)
         return response.Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class FactVotesView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @buffered(FunFact, "fact_id", allow_none=True)
+    def put(self, request, **kwargs):
+        fact_id = int(kwargs["fact_id"])
+        result = put_vote(self.request.user, FunFact, fact_id, kwargs)
+        caching.invalidate_fact(fact_id, ranking=True)
+        return result
+
+    @buffered(FunFact, "fact_id")
     def post(self, request, **kwargs):
         fact = get_object_or_404(FunFact, pk=kwargs["fact_id"])
         user = self.request.user
-        vote_value = kwargs["vote_value"]
+        vote_value = get_vote_value(kwargs)
 
         try:
-            print("fact", fact)
-            FunFactVote.objects.create(author=user, tagged_object=fact, vote=vote_value)
+            with transaction.atomic():
+                FunFactVote.objects.create(
+                    author=user, tagged_object=fact, vote=vote_value
+                )
+                fact.shift_votes(added=vote_value)
             return response.Response(
                 {"message": "successful"}, status=status.HTTP_200_OK
             )
         except IntegrityError:
             raise VoteAlreadyExists
-        except Exception as e:
-            print(e)
 
+    @buffered(FunFact, "fact_id", withdraw=True)
     def delete(self, request, **kwargs):
         fact = get_object_or_404(FunFact, pk=kwargs["fact_id"])
         user = self.request.user
-        try:
-            vote = fact.tags.get(author=user)
-        except FunFactVote.DoesNotExist:
-            raise VoteNotFound
-        vote.delete()
+        with transaction.atomic():
+            try:
+                vote = fact.tags.select_for_update().get(author=user)
+            except FunFactVote.DoesNotExist:
+                raise VoteNotFound
+            vote.delete()
+            fact.shift_votes(removed=vote.vote)
         return response.Response(
             {"message": "record deleted"}, status=status.HTTP_200_OK
         )
 
+    @buffered(FunFact, "fact_id")
     def patch(self, request, **kwargs):
         fact = get_object_or_404(FunFact, pk=kwargs["fact_id"])
         user = self.request.user
-        try:
-            vote = fact.tags.get(author=user)
-        except FunFactVote.DoesNotExist:
-            raise VoteNotFound
-        vote_value = kwargs["vote_value"]
-        vote.vote = vote_value
-        vote.save()
+        vote_value = get_vote_value(kwargs)
+        with transaction.atomic():
+            try:
+                vote = fact.tags.select_for_update().get(author=user)
+            except FunFactVote.DoesNotExist:
+                raise VoteNotFound
+            previous = vote.vote
+            vote.vote = vote_value
+            vote.save()
+            fact.shift_votes(removed=previous, added=vote_value)
         return response.Response(
             {"message": "record updated"}, status=status.HTTP_200_OK
         )
+
+
+class BatchVotesView(APIView):
+    """
+    Apply a batch of votes on facts and comments in one transaction, for
+    clients replaying votes queued while offline. Later operations on the same
+    object win, ``none`` withdraws a vote.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    max_batch_size = 100
+    targets = {"fact": FunFact, "comment": FunFactComment}
+
+    def post(self, request, **kwargs):
+        if not isinstance(request.data, dict):
+            raise ValidationError({"votes": "Expected a list of votes."})
+        operations = request.data.get("votes")
+        if not isinstance(operations, list):
+            raise ValidationError({"votes": "Expected a list of votes."})
+        if len(operations) > self.max_batch_size:
+            raise ValidationError(
+                {"votes": f"At most {self.max_batch_size} votes per batch."}
+            )
+
+        results, votes = [], {target: {} for target in self.targets}
+        for operation in operations:
+            serializer = VoteOperationSerializer(data=operation)
+            if not serializer.is_valid():
+                errors = camelize_keys(serializer.errors)
+                results.append({"status": "invalid", "errors": errors})
+                continue
+            data = serializer.validated_data
+            vote = None if data["vote"] == "none" else data["vote"]
+            votes[data["target"]][data["id"]] = vote
+            results.append(dict(data))
+
+        with transaction.atomic():
+            applied = {
+                target: FunFactVote.objects.apply_votes(
+                    self.request.user, model, votes[target]
+                )
+                for target, model in self.targets.items()
+            }
+            for fact_id in applied["fact"]:
+                caching.invalidate_fact(fact_id, ranking=True)
+            for comment_id in applied["comment"]:
+                caching.invalidate_comment(comment_id)
+
+        for result in results:
+            if "status" not in result:
+                found = result["id"] in applied[result["target"]]
+                result["status"] = "applied" if found else "not_found"
+        return response.Response({"results": results}, status=status.HTTP_200_OK)
@@ -0,0 +1,178 @@
+"""
+Optional write-behind mode for the vote endpoints.
+
+With ``VOTE_WRITE_BEHIND`` enabled, votes are not written by the request that
+casts them. They go into a per-process ``VoteBuffer`` that keeps only the
+latest vote of every user on every object, and a background thread flushes it
+every ``VOTE_FLUSH_INTERVAL`` seconds, or as soon as ``VOTE_FLUSH_SIZE`` votes
+are waiting. A flush writes the votes in bulk and shifts each object's counters
+once with the summed deltas of all voters, so a burst of votes on one popular
+fact takes its row lock once per flush instead of once per vote.
+
+Until their votes are flushed, voters see them through ``overlay``.
+
+Each voter's votes are written in a savepoint. Votes that cannot be written,
+like those of a user deleted before the flush, are logged and dropped without
+holding up the others. Only a flush failing as a whole, e.g. on a lost
+connection, is put back in the buffer for the next one.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import (
+    DataError,
+    IntegrityError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from mow_api import caching
+from mow_api.models import FunFact, FunFactVote
+
+logger = logging.getLogger(__name__)
+
+
+class VoteBuffer:
+    def __init__(self, flush_interval, flush_size):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.wakeup = threading.Event()
+        self.worker = None
+
+    def record(self, author, model, object_id, vote):
+        with self.lock:
+            self.pending[(author.pk, model, object_id)] = (author, vote)
+            full = len(self.pending) >= self.flush_size
+            if self.worker is None:
+                self.start()
+        invalidate(model, object_id)
+        if full:
+            self.wakeup.set()
+
+    def pending_vote(self, author, model, object_id):
+        """
+        Return ``(True, vote)`` for a vote of ``author`` still in the buffer,
+        ``(False, None)`` otherwise.
+        """
+        with self.lock:
+            entry = self.pending.get((author.pk, model, object_id))
+        if entry is None:
+            return False, None
+        return True, entry[1]
+
+    def overlay(self, author, model, object_id, data):
+        """
+        Show ``author``'s buffered vote in the serialized ``data`` of an object:
+        their reaction and the counters as they will be after the flush.
+        """
+        if not author.is_authenticated:
+            return data
+        found, vote = self.pending_vote(author, model, object_id)
+        if not found:
+            return data
+        before = data.get("user_reaction")
+        up = (vote == FunFactVote.VoteType.UPVOTE) - (
+            before == FunFactVote.VoteType.UPVOTE
+        )
+        down = (vote == FunFactVote.VoteType.DOWNVOTE) - (
+            before == FunFactVote.VoteType.DOWNVOTE
+        )
+        data["user_reaction"] = vote
+        data["upvote_count"] += up
+        data["downvote_count"] += down
+        data["count_votes"] += up - down
+        return data
+
+    def start(self):
+        self.worker = threading.Thread(
+            target=self.run, name="vote-write-behind", daemon=True
+        )
+        self.worker.start()
+        atexit.register(self.flush)
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing buffered votes failed")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        with self.lock:
+            batch, self.pending = self.pending, {}
+        if not batch:
+            return 0
+
+        grouped = defaultdict(lambda: defaultdict(dict))
+        for (_, model, object_id), (author, vote) in batch.items():
+            grouped[model][author][object_id] = vote
+        dropped = 0
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    # Check foreign keys in each savepoint rather than at commit.
+                    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+                for model, votes_by_author in grouped.items():
+                    deltas = defaultdict(lambda: (0, 0))
+                    for author, votes in votes_by_author.items():
+                        try:
+                            with transaction.atomic():
+                                written = FunFactVote.objects.write_votes(
+                                    author, model, votes
+                                )
+                        except (DataError, IntegrityError):
+                            logger.exception(
+                                "Dropping %d buffered votes of user %s",
+                                len(votes),
+                                author.pk,
+                            )
+                            dropped += len(votes)
+                            continue
+                        for object_id, (up, down) in written.items():
+                            total_up, total_down = deltas[object_id]
+                            deltas[object_id] = (total_up + up, total_down + down)
+                    model.objects.apply_vote_deltas(deltas)
+                    for object_id in deltas:
+                        invalidate(model, object_id)
+        except Exception:
+            self.requeue(batch)
+            raise
+        return len(batch) - dropped
+
+    def requeue(self, batch):
+        with self.lock:
+            # Votes recorded since the failed flush are newer and win.
+            self.pending = {**batch, **self.pending}
+
+
+def invalidate(model, object_id):
+    if model is FunFact:
+        caching.invalidate_fact(object_id, ranking=True)
+    else:
+        caching.invalidate_comment(object_id)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """
+    The process-wide ``VoteBuffer``, or ``None`` when write-behind is disabled.
+    """
+    global _buffer
+    if not settings.VOTE_WRITE_BEHIND:
+        return None
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = VoteBuffer(settings.VOTE_FLUSH_INTERVAL, settings.VOTE_FLUSH_SIZE)
+    return _buffer